@@ -0,0 +1,557 @@
+"""Loading of benchmark reports and their columnar sidecar cache.
+
+A report directory holds a ``benchmark_results.json`` written by the benchmark
+run, or a ``benchmark_results.jsonl`` metrics stream with one record per line
+that the runner appends to while it runs, plus a ``benchmark_summary.json``
+written once the run is complete. Readers only take complete lines of a stream,
+so an in-progress or crashed run can always be read up to its last record.
+
+The first time a complete report is loaded its metrics are converted into a
+Parquet sidecar next to the results file, so later loads can read only the
+columns they need instead of parsing the whole document.
+
+The free-text fields (answers, SQL, query results) are kept out of the sidecar
+in a text store: one JSON record per row behind a table of byte offsets. Single
+rows are read from it through a memory map when a test case is opened, so the
+metrics frame never carries the text.
+
+Every file is written through ``atomic_write``, so readers never see a partial
+file and concurrent writers never share a temporary file.
+
+Run ``python benchmark_data.py [REPORT_DIR ...]`` to convert reports up front
+(all of ``results/`` when no directory is given), or with ``--memory`` to compare
+the memory of the metrics frame with and without the compact schema.
+"""
+import argparse
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RESULTS_FILE = "benchmark_results.json"
+RESULTS_STREAM_FILE = "benchmark_results.jsonl"
+# Written next to a metrics stream when the run is complete
+SUMMARY_FILE = "benchmark_summary.json"
+SIDECAR_FILE = "benchmark_results.parquet"
+# Bump when the layout of the metrics frame changes so older sidecars are rebuilt
+SIDECAR_VERSION = "4"
+TEXT_STORE_FILE = "benchmark_results.text"
+# Text store layout: magic, row count, row count + 1 offsets into the records, records
+TEXT_STORE_MAGIC = b"BRTEXT1\n"
+_TEXT_STORE_HEADER = struct.Struct("<8sQ")
+
+# Flattened operation times are stored as "operation_times.<operation>" columns
+OPERATION_TIME_PREFIX = "operation_times."
+
+# Results files larger than this are parsed record by record instead of with json.load
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+# Metric records per DataFrame chunk when streaming a results file
+STREAM_CHUNK_SIZE = 20_000
+
+# Free-text fields only needed by the single test case view, kept in the text store
+TEXT_COLUMNS = ["answer", "sql", "sql_result", "debug_answer", "error", "explanation"]
+
+# Permissions of files written by atomic_write (mkstemp creates them owner-only)
+WRITTEN_FILE_MODE = 0o644
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+# Low-cardinality text columns stored as categoricals
+CATEGORICAL_COLUMNS = [
+    "complexity",
+    "language",
+    "category",
+    "scenario_type",
+    "error_type",
+    "features",
+    "ai_search_pattern",
+]
+
+# Small counters and the smallest integer type that holds them
+INTEGER_COLUMNS = {
+    "chat_context_depth": "int8",
+    "retry_attempt": "int8",
+    "iteration": "int16",
+}
+
+
+def results_path(report_dir):
+    """Path of a report's results file: the JSON document, else its metrics stream."""
+    report_dir = Path(report_dir)
+    stream = report_dir / RESULTS_STREAM_FILE
+    if stream.exists() and not (report_dir / RESULTS_FILE).exists():
+        return stream
+    return report_dir / RESULTS_FILE
+
+
+def report_is_complete(report_dir):
+    """Check whether a report's run has finished: a JSON results file, or a stream with its summary."""
+    return results_path(report_dir).name == RESULTS_FILE or (Path(report_dir) / SUMMARY_FILE).exists()
+
+
+def read_metrics_stream(path, offset=0):
+    """Read the complete records of a metrics stream from byte ``offset`` on.
+
+    Returns the records and the offset just past the last complete line, from
+    which the next read continues. A trailing line still being written is left
+    for the next read.
+    """
+    records, _, end = read_metrics_stream_lines(path, offset)
+    return records, end
+
+
+def read_metrics_stream_lines(path, offset=0):
+    """Like ``read_metrics_stream``, also returning the ``(start, end)`` byte span of each record's line."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    records, spans = [], []
+    start = 0
+    end = data.rfind(b"\n") + 1
+    while start < end:
+        line_end = data.index(b"\n", start) + 1
+        if data[start:line_end].strip():
+            records.append(json.loads(data[start:line_end]))
+            spans.append((offset + start, offset + line_end))
+        start = line_end
+    return records, spans, offset + end
+
+
+def _iter_stream_records(path):
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_summary(report_dir):
+    """The summary of a report's run, or None while a streamed run is in progress."""
+    report_dir = Path(report_dir)
+    if results_path(report_dir).name == RESULTS_FILE:
+        return load_benchmark_data(report_dir).get("summary")
+    try:
+        with open(report_dir / SUMMARY_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_benchmark_data(report_dir):
+    """Load benchmark results and metadata from a report directory."""
+    results_file = results_path(report_dir)
+    if results_file.name == RESULTS_STREAM_FILE:
+        records, _ = read_metrics_stream(results_file)
+        return {"metrics": records, "summary": load_summary(report_dir)}
+    with open(results_file) as f:
+        data = json.load(f)
+    return data
+
+
+def _flatten_metrics(data):
+    df = pd.DataFrame(data["metrics"])
+    if "operation_times" not in df.columns:
+        return df
+    op_times = pd.DataFrame(
+        [x if isinstance(x, dict) else {} for x in df.pop("operation_times")],
+        index=df.index,
+    ).astype("float32")
+    return df.join(op_times.add_prefix(OPERATION_TIME_PREFIX))
+
+
+def apply_schema(df, float32_timings=False):
+    """Convert a metrics DataFrame to its compact column types.
+
+    ``CATEGORICAL_COLUMNS`` become categoricals and ``INTEGER_COLUMNS`` their small
+    integer types (nullable when a value is missing). With ``float32_timings``
+    the duration is stored as float32 like the operation times.
+    """
+    types = {column: "category" for column in CATEGORICAL_COLUMNS if column in df.columns}
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df.columns:
+            types[column] = dtype.capitalize() if df[column].isna().any() else dtype
+    if float32_timings and "duration" in df.columns:
+        types["duration"] = "float32"
+    return df.astype(types)
+
+
+def create_metrics_df(data, float32_timings=False):
+    """Convert benchmark metrics to DataFrame.
+
+    The ``operation_times`` dicts are flattened once into float32
+    ``operation_times.<operation>`` columns (NaN where an operation did not run),
+    and the columns are given their compact types (see ``apply_schema``).
+    """
+    return apply_schema(_flatten_metrics(data), float32_timings=float32_timings)
+
+
+def iter_metrics_chunks(report_dir, chunk_size=STREAM_CHUNK_SIZE, with_text=True):
+    """Parse the metrics array of a results file incrementally, yielding DataFrame chunks.
+
+    Only one chunk of metric records exists as Python objects at a time, so memory
+    stays proportional to the DataFrame rather than to the JSON document.
+    """
+    import ijson
+
+    results_file = results_path(report_dir)
+    with open(results_file, "rb") as f:
+        if results_file.name == RESULTS_STREAM_FILE:
+            records = _iter_stream_records(results_file)
+        else:
+            records = ijson.items(f, "metrics.item", use_float=True)
+        while chunk := list(itertools.islice(records, chunk_size)):
+            df = create_metrics_df({"metrics": chunk})
+            if not with_text:
+                df = df.drop(columns=TEXT_COLUMNS, errors="ignore")
+            yield df
+
+
+def stream_metrics_df(report_dir, with_text=True, on_progress=None):
+    """Build the metrics DataFrame of a report from its results file in chunks.
+
+    ``on_progress`` is called with each chunk as soon as it is parsed.
+    """
+    chunks = []
+    for chunk in iter_metrics_chunks(report_dir, with_text=with_text):
+        chunks.append(chunk)
+        if on_progress is not None:
+            on_progress(chunk)
+    if not chunks:
+        return create_metrics_df({"metrics": []})
+    # Chunks see different category values; align them so the concatenation stays categorical
+    return pd.concat(align_categoricals(chunks), ignore_index=True)
+
+
+def parse_metrics(report_dir, with_text=True, on_progress=None):
+    """Parse the results file of a report, streaming it when it is large."""
+    results_file = results_path(report_dir)
+    if results_file.stat().st_size > STREAMING_THRESHOLD_BYTES:
+        return stream_metrics_df(report_dir, with_text=with_text, on_progress=on_progress)
+    df = create_metrics_df(load_benchmark_data(report_dir))
+    if not with_text:
+        df = df.drop(columns=TEXT_COLUMNS, errors="ignore")
+    if on_progress is not None:
+        on_progress(df)
+    return df
+
+
+def operation_time_columns(df):
+    """Names of the flattened operation time columns of a metrics DataFrame."""
+    return [c for c in df.columns if c.startswith(OPERATION_TIME_PREFIX)]
+
+
+def operation_times_frame(df):
+    """Return the operation times of a metrics DataFrame, one column per operation."""
+    columns = operation_time_columns(df)
+    return df[columns].rename(columns=lambda c: c[len(OPERATION_TIME_PREFIX):])
+
+
+def align_categoricals(frames, columns=CATEGORICAL_COLUMNS):
+    """Convert ``columns`` of each frame to categoricals sharing the same categories.
+
+    Concatenating the aligned frames keeps the categorical dtype instead of
+    falling back to object columns. Categories are collected as plain values,
+    so a column that is entirely null in one frame (its categories then have
+    no string dtype) still aligns with the others.
+    """
+    frames = list(frames)
+    for column in columns:
+        present = [df[column] for df in frames if column in df.columns]
+        if not present:
+            continue
+        categories = dict.fromkeys(
+            value for s in present for value in s.astype("category").cat.categories.astype("object")
+        )
+        dtype = pd.CategoricalDtype(pd.Index(list(categories), dtype=None if categories else "object"))
+        frames = [
+            df.assign(**{column: df[column].astype(dtype)}) if column in df.columns else df
+            for df in frames
+        ]
+    return frames
+
+
+def get_report_dirs(results_dir="results"):
+    """List report directories that contain a results file, newest first."""
+    results_dir = Path(results_dir)
+    return sorted(
+        (d for d in results_dir.iterdir() if results_path(d).exists()),
+        reverse=True,
+    )
+
+
+def report_signature(report_dir):
+    """Return the cache key of a report: results file path, mtime and size."""
+    results_file = results_path(report_dir)
+    stat = results_file.stat()
+    return str(results_file), stat.st_mtime_ns, stat.st_size
+
+
+def sidecar_path(report_dir):
+    """Path of the Parquet sidecar of a report."""
+    return Path(report_dir) / SIDECAR_FILE
+
+
+def text_store_path(report_dir):
+    """Path of the free-text store of a report."""
+    return Path(report_dir) / TEXT_STORE_FILE
+
+
+def sidecar_is_current(report_dir):
+    """Check whether the sidecar and text store exist, the sidecar has the current layout,
+    and neither is older than the results file."""
+    import pyarrow.parquet as pq
+
+    sidecar = sidecar_path(report_dir)
+    text_store = text_store_path(report_dir)
+    if not sidecar.exists() or not text_store.exists():
+        return False
+    results_mtime = results_path(report_dir).stat().st_mtime_ns
+    if min(sidecar.stat().st_mtime_ns, text_store.stat().st_mtime_ns) < results_mtime:
+        return False
+    metadata = pq.read_schema(sidecar).metadata or {}
+    return metadata.get(b"sidecar_version") == SIDECAR_VERSION.encode()
+
+
+@contextmanager
+def atomic_write(path, mode="wb", encoding=None):
+    """Open a new temporary file next to ``path`` and rename it over ``path`` once written.
+
+    Each call gets its own temporary file, so threads and processes writing the
+    same path never clobber each other; the last one to finish wins. Nothing is
+    replaced if the block raises.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, WRITTEN_FILE_MODE)
+        with open(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_name, path)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def path_lock(path):
+    """Lock of this process serializing read-modify-write cycles of the file at ``path``.
+
+    Reentrant, so an update may call other functions that take the same lock.
+    """
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        return _path_locks.setdefault(key, threading.RLock())
+
+
+def spawn_pool(workers):
+    """Process pool of ``workers`` processes started with spawn.
+
+    Spawn rather than fork: the Streamlit server process runs many threads, and a
+    forked child inherits their locks in whatever state they happen to be.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def write_text_store(report_dir, df):
+    """Write the free-text columns of a metrics DataFrame as the report's text store.
+
+    Each row is stored as a JSON object of its ``TEXT_COLUMNS``, so any row can
+    be read on its own.
+    """
+    columns = [c for c in TEXT_COLUMNS if c in df.columns]
+    texts = df[columns].astype(object)
+    texts = texts.where(texts.notna(), None)
+    records = [
+        json.dumps(dict(zip(columns, row))).encode()
+        for row in texts.itertuples(index=False, name=None)
+    ]
+    offsets = np.zeros(len(records) + 1, dtype="<u8")
+    np.cumsum([len(record) for record in records], out=offsets[1:])
+
+    text_store = text_store_path(report_dir)
+    with atomic_write(text_store) as f:
+        f.write(_TEXT_STORE_HEADER.pack(TEXT_STORE_MAGIC, len(records)))
+        f.write(offsets.tobytes())
+        f.writelines(records)
+    return text_store
+
+
+def read_texts(report_dir, positions):
+    """Read the free-text fields of the rows at ``positions`` from the report's text store.
+
+    Only the requested records are touched, through a memory map of the file.
+    Returns a DataFrame of ``TEXT_COLUMNS`` indexed by position.
+    """
+    positions = list(positions)
+    with open(text_store_path(report_dir), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        magic, row_count = _TEXT_STORE_HEADER.unpack_from(m)
+        if magic != TEXT_STORE_MAGIC:
+            raise ValueError(f"{text_store_path(report_dir)} is not a text store")
+        data_start = _TEXT_STORE_HEADER.size + 8 * (row_count + 1)
+        records = []
+        for position in positions:
+            if not 0 <= position < row_count:
+                raise IndexError(f"row {position} out of range for {row_count} rows")
+            start, end = struct.unpack_from("<2Q", m, _TEXT_STORE_HEADER.size + 8 * position)
+            records.append(json.loads(m[data_start + start:data_start + end]))
+    return pd.DataFrame(records, index=positions, columns=TEXT_COLUMNS)
+
+
+def read_text_fields(report_dir, positions):
+    """Free-text fields of the rows at ``positions``, from the text store when it is current.
+
+    Falls back to parsing the results file when the report has no current
+    sidecar (e.g. a read-only results directory).
+    """
+    try:
+        if sidecar_is_current(report_dir):
+            return read_texts(report_dir, positions)
+    except ImportError:
+        pass
+    positions = list(positions)
+    df = parse_metrics(report_dir).iloc[positions]
+    return df.reindex(columns=TEXT_COLUMNS).set_axis(positions)
+
+
+def write_sidecar(report_dir, df):
+    """Write a metrics DataFrame as the report's Parquet sidecar and text store.
+
+    The free-text columns go to the text store, everything else to the sidecar.
+    Both are written to a temporary name first and renamed into place, the
+    sidecar last, so readers never see a partially written or mismatched pair.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    write_text_store(report_dir, df)
+    df = df.drop(columns=TEXT_COLUMNS, errors="ignore")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"sidecar_version": SIDECAR_VERSION.encode(),
+    })
+    sidecar = sidecar_path(report_dir)
+    with atomic_write(sidecar) as f:
+        pq.write_table(table, f)
+    return sidecar
+
+
+def convert_report(report_dir, on_progress=None):
+    """Convert a report's results file into its Parquet sidecar."""
+    return write_sidecar(report_dir, parse_metrics(report_dir, on_progress=on_progress))
+
+
+def ensure_sidecar(report_dir, on_progress=None):
+    """Convert a report to its sidecar unless it is already current.
+
+    Returns whether a current sidecar exists afterwards. Runs still in progress
+    are not converted.
+    """
+    try:
+        if sidecar_is_current(report_dir):
+            return True
+        if not report_is_complete(report_dir) or not os.access(report_dir, os.W_OK):
+            return False
+        convert_report(report_dir, on_progress=on_progress)
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def read_sidecar(report_dir, with_text=True):
+    """Read the metrics DataFrame from a report's sidecar.
+
+    With ``with_text`` the free-text columns of every row are joined from the
+    text store; without it the text store is not read at all.
+    """
+    df = pd.read_parquet(sidecar_path(report_dir))
+    if with_text:
+        df = df.join(read_texts(report_dir, range(len(df))))
+    return df
+
+
+def read_metrics(report_dir, with_text=True, on_progress=None):
+    """Load the metrics DataFrame of a report, converting it to a sidecar on first use.
+
+    When the results file has to be parsed, ``on_progress`` receives the parsed
+    chunks. If the sidecar cannot be written (read-only results directory or no
+    Parquet engine installed) the parsed frame is returned all the same. Runs
+    still in progress are parsed every time and never converted.
+    """
+    if not report_is_complete(report_dir):
+        return parse_metrics(report_dir, with_text=with_text, on_progress=on_progress)
+    try:
+        if sidecar_is_current(report_dir):
+            return read_sidecar(report_dir, with_text=with_text)
+    except ImportError:
+        return parse_metrics(report_dir, with_text=with_text, on_progress=on_progress)
+
+    df = parse_metrics(report_dir, on_progress=on_progress)
+    try:
+        write_sidecar(report_dir, df)
+    except OSError:
+        pass
+    if not with_text:
+        df = df.drop(columns=TEXT_COLUMNS, errors="ignore")
+    return df
+
+
+def memory_report(report_dir):
+    """Memory of a report's metrics frame without and with the compact schema.
+
+    Returns ``{layout: (bytes with text columns, bytes without)}`` for the
+    untyped frame, the compact schema and the compact schema with float32 timings.
+    """
+    data = load_benchmark_data(report_dir)
+    frames = {
+        "untyped": _flatten_metrics(data),
+        "compact": create_metrics_df(data),
+        "compact, float32 timings": create_metrics_df(data, float32_timings=True),
+    }
+    return {
+        layout: (
+            int(df.memory_usage(deep=True).sum()),
+            int(df.drop(columns=TEXT_COLUMNS, errors="ignore").memory_usage(deep=True).sum()),
+        )
+        for layout, df in frames.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert benchmark reports to Parquet sidecars.")
+    parser.add_argument("reports", nargs="*", type=Path, help="report directories (default: all of results/)")
+    parser.add_argument("--force", action="store_true", help="rewrite sidecars that are already current")
+    parser.add_argument("--memory", action="store_true",
+                        help="print the memory of each report's metrics frame instead of converting")
+    args = parser.parse_args()
+
+    if args.memory:
+        for report_dir in args.reports or get_report_dirs():
+            print(f"{report_dir}:")
+            for layout, (total, without_text) in memory_report(report_dir).items():
+                print(f"  {layout:<26} {total / 1024:>10,.0f} KiB   {without_text / 1024:>8,.0f} KiB without text")
+        return
+
+    for report_dir in args.reports or get_report_dirs():
+        if not report_is_complete(report_dir):
+            print(f"{report_dir}: run in progress, skipped")
+            continue
+        if sidecar_is_current(report_dir) and not args.force:
+            print(f"{report_dir}: up to date")
+            continue
+        sidecar = convert_report(report_dir)
+        print(f"{report_dir}: wrote {sidecar} ({sidecar.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""Replay the benchmark test cases against a chat endpoint.
+
+Test cases are read from ``batches/batch_*.jsonl`` (or any JSONL files given)
+and POSTed as JSON to the target, which answers with the fields of a result
+(``answer``, ``sql``, ``sql_result``, ``error_type``, ``error``, ``explanation``,
+``operation_times``, ``debug_answer``). Results go to a new
+``results/report_<timestamp>/`` in the same ``metrics`` schema as the recorded
+runs: by default each result is appended to ``benchmark_results.jsonl`` as soon
+as it is known, and ``benchmark_summary.json`` is written at the end (see
+``results_stream``); ``--format json`` writes a single ``benchmark_results.json``
+once the run is done instead.
+
+At most ``--concurrency`` requests are in flight. Without ``--rate`` the runner
+is closed-loop: a request is sent as soon as a slot frees up. With ``--rate``
+requests arrive open-loop at that many per second, independently of how fast
+the target answers; a request's duration is then measured from its scheduled
+arrival, so time spent waiting for a free slot counts against the target.
+
+    python benchmark_runner.py http://localhost:8000/chat --concurrency 8 --rate 2
+    python benchmark_runner.py --stub --iterations 2   # against a local stub server
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmark_data import RESULTS_FILE, atomic_write
+from case_index import case_id
+from results_stream import MetricsStreamWriter, write_summary
+
+DEFAULT_CONCURRENCY = 4
+# Seconds before a request is abandoned and recorded as a timeout
+DEFAULT_TIMEOUT = 120.0
+ARRIVAL_PROCESSES = ["poisson", "uniform"]
+OUTPUT_FORMATS = ["jsonl", "json"]
+
+# Error types recorded when the target does not answer properly
+TIMEOUT_ERROR = "TIMEOUT"
+UNEXPECTED_ERROR = "UNEXPECTED"
+
+# Mean seconds of each operation simulated by the stub server
+STUB_OPERATION_SECONDS = {
+    "Basic Chat Processing": 1.0,
+    "User Intent Analysis": 2.0,
+    "VannaAI SQL Generation": 3.0,
+    "Query Execution": 2.5,
+    "Retry Analysis": 1.5,
+    "Query Fixing": 2.0,
+    "Answer Generation": 6.0,
+    "Error Response Generation": 1.5,
+}
+
+
+def find_case_files(batches_dir="batches"):
+    """The batch files of a batches directory, in batch order."""
+    return sorted(Path(batches_dir).glob("batch_*.jsonl"))
+
+
+def load_test_cases(paths):
+    """Read the test cases of JSONL files, in file order."""
+    cases = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            cases.extend(json.loads(line) for line in f if line.strip())
+    return cases
+
+
+def test_case_id(case):
+    """Stable ID of a test case, shared by all of its iterations and by every run replaying it."""
+    return case_id(result_record(case, {}, None, None, None))
+
+
+def result_record(case, response, duration, iteration, case_id):
+    """A result in the ``metrics`` schema of ``benchmark_results.json``."""
+    return {
+        "question": case["question"],
+        "answer": response.get("answer", ""),
+        "sql": response.get("sql"),
+        "sql_result": response.get("sql_result"),
+        "error_type": response.get("error_type"),
+        "error": response.get("error"),
+        "explanation": response.get("explanation"),
+        "duration": duration,
+        "operation_times": response.get("operation_times") or {},
+        "debug_answer": response.get("debug_answer", ""),
+        "complexity": case["complexity"],
+        "features": case["features"],
+        "language": case["language"],
+        "category": case["category"],
+        "scenario_type": case["scenario_type"],
+        "chat_context_depth": len(case.get("chat_history") or []),
+        "retry_attempt": int(bool(case.get("need_retry"))),
+        "force_data_reason": "verification_needed" if case.get("force_data") else "",
+        "ai_search_pattern": "pattern_detection" if case.get("ai_search") else "",
+        "iteration": iteration,
+        "test_case_id": case_id,
+    }
+
+
+def error_response(error_type, message):
+    return {"answer": "", "error_type": error_type, "error": message}
+
+
+async def _read_http_message(reader):
+    """Read the start line, headers and body of an HTTP/1.1 message."""
+    start_line = (await reader.readline()).decode("latin-1").strip()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = b""
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+    return start_line, headers, body
+
+
+async def post_json(url, payload):
+    """POST ``payload`` as JSON and return the status code and body of the response."""
+    parts = urlsplit(url)
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    body = json.dumps(payload).encode("utf-8")
+    request = (
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode("latin-1") + body
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=https or None)
+    try:
+        writer.write(request)
+        await writer.drain()
+        status_line, _, response_body = await _read_http_message(reader)
+    finally:
+        writer.close()
+    return int(status_line.split()[1]), response_body
+
+
+def http_target(url):
+    """Target that POSTs each test case to ``url`` and reads the result fields from the JSON answer."""
+    async def send(case):
+        status, body = await post_json(url, case)
+        if status >= 400:
+            return error_response(UNEXPECTED_ERROR, f"HTTP {status}: {body[:500].decode('utf-8', 'replace')}")
+        return json.loads(body)
+    return send
+
+
+def arrival_offsets(count, rate=None, arrivals="poisson", rng=None):
+    """Seconds after the start at which each request is sent; all zero when closed-loop."""
+    if not rate:
+        return [0.0] * count
+    if arrivals == "uniform":
+        return [i / rate for i in range(count)]
+    rng = rng or random.Random()
+    offsets, t = [], 0.0
+    for _ in range(count):
+        offsets.append(t)
+        t += rng.expovariate(rate)
+    return offsets
+
+
+async def run_benchmark(cases, send, iterations=1, concurrency=DEFAULT_CONCURRENCY, rate=None,
+                        arrivals="poisson", timeout=DEFAULT_TIMEOUT, seed=0, on_result=None):
+    """Send every test case ``iterations`` times and return the results.
+
+    ``send`` is a coroutine function taking a test case and returning the
+    target's response fields. Requests go out iteration by iteration; results
+    are returned grouped by test case, like the recorded runs. ``on_result`` is
+    called with each result as soon as its request finishes.
+    """
+    rng = random.Random(seed)
+    case_ids = [test_case_id(case) for case in cases]
+    jobs = [(iteration, i) for iteration in range(iterations) for i in range(len(cases))]
+    offsets = arrival_offsets(len(jobs), rate, arrivals, rng)
+    slots = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def run_job(job, offset):
+        iteration, i = job
+        scheduled = started + offset
+        await asyncio.sleep(max(scheduled - loop.time(), 0.0))
+        async with slots:
+            sent = loop.time()
+            try:
+                response = await asyncio.wait_for(send(cases[i]), timeout)
+            except asyncio.TimeoutError:
+                response = error_response(TIMEOUT_ERROR, f"No response within {timeout:g}s")
+            except Exception as e:
+                response = error_response(UNEXPECTED_ERROR, f"{type(e).__name__}: {e}")
+            finished = loop.time()
+        duration = finished - (scheduled if rate else sent)
+        record = result_record(cases[i], response, duration, iteration, case_ids[i])
+        if on_result is not None:
+            on_result(record)
+        return record
+
+    results = await asyncio.gather(*(run_job(job, offset) for job, offset in zip(jobs, offsets)))
+    return [results[iteration * len(cases) + i] for i in range(len(cases)) for iteration in range(iterations)]
+
+
+def write_results(report_dir, metrics, summary):
+    """Write a ``benchmark_results.json`` atomically, so readers never see a partial file."""
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    path = report_dir / RESULTS_FILE
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump({"metrics": metrics, "summary": summary}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+class StubServer:
+    """Local HTTP server answering test cases like the chat endpoint, for trying out the runner.
+
+    Each request sleeps through simulated operations whose times are drawn
+    around ``STUB_OPERATION_SECONDS`` and multiplied by ``scale``. A share
+    ``error_rate`` of the requests is answered with an error. With a
+    ``capacity``, at most that many requests are processed at once and the rest
+    queue, so the stub saturates like a real deployment.
+    """
+
+    def __init__(self, scale=0.01, error_rate=0.0, seed=0, capacity=None):
+        self.scale = scale
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.capacity = capacity
+        self._workers = asyncio.Semaphore(capacity) if capacity else None
+        self.server = None
+
+    @property
+    def url(self):
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/chat"
+
+    def _operation_time(self, operation):
+        return STUB_OPERATION_SECONDS[operation] * self.rng.lognormvariate(0, 0.4) * self.scale
+
+    async def answer(self, case):
+        if self.rng.random() < self.error_rate:
+            operations = ["Basic Chat Processing", "User Intent Analysis", "Error Response Generation"]
+        else:
+            operations = ["Basic Chat Processing", "User Intent Analysis", "VannaAI SQL Generation", "Query Execution"]
+            if case.get("need_retry"):
+                operations += ["Retry Analysis", "Query Fixing", "Query Execution"]
+            operations.append("Answer Generation")
+        operation_times = {}
+        for operation in operations:
+            seconds = self._operation_time(operation)
+            await asyncio.sleep(seconds)
+            operation_times[operation] = operation_times.get(operation, 0.0) + seconds
+        if "Error Response Generation" in operation_times:
+            response = error_response("PROMPTFLOW", "Cannot answer the question based on the user intent")
+        else:
+            response = {"answer": f"Stub answer to: {case['question']}", "sql": "SELECT 1", "sql_result": "|    |   1 |"}
+        response["operation_times"] = operation_times
+        return response
+
+    async def _handle(self, reader, writer):
+        try:
+            _, _, body = await _read_http_message(reader)
+            if self._workers is None:
+                response = await self.answer(json.loads(body))
+            else:
+                async with self._workers:
+                    response = await self.answer(json.loads(body))
+            payload = json.dumps(response).encode("utf-8")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # The runner gave up on the request, or the server is shutting down
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def run(args):
+    case_files = args.cases or find_case_files(args.batches_dir)
+    cases = load_test_cases(case_files)
+    if not cases:
+        raise SystemExit("No test cases found")
+
+    stub = None
+    target = args.target
+    if args.stub:
+        stub = await StubServer(args.stub_scale, args.stub_error_rate, args.seed, args.stub_capacity).start()
+        target = stub.url
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_dir = args.output or args.results_dir / f"report_{timestamp}"
+    # Without a summary the stream of an interrupted run stays readable as in progress
+    writer = MetricsStreamWriter(report_dir) if args.format == "jsonl" else None
+    try:
+        started = time.perf_counter()
+        metrics = await run_benchmark(
+            cases, http_target(target), iterations=args.iterations, concurrency=args.concurrency,
+            rate=args.rate, arrivals=args.arrivals, timeout=args.timeout, seed=args.seed,
+            on_result=writer.append if writer is not None else None,
+        )
+        wall_seconds = time.perf_counter() - started
+    finally:
+        if writer is not None:
+            writer.close()
+        if stub is not None:
+            await stub.close()
+
+    summary = {
+        "total_runs": len(metrics),
+        "total_test_cases": len(cases),
+        "total_batches": len(case_files),
+        "timestamp": timestamp,
+        "runner": {
+            "target": target,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "arrivals": args.arrivals if args.rate else None,
+            "timeout": args.timeout,
+            "wall_seconds": wall_seconds,
+        },
+    }
+    if writer is not None:
+        write_summary(report_dir, summary)
+    else:
+        write_results(report_dir, metrics, summary)
+    errors = sum(m["error_type"] is not None for m in metrics)
+    print(f"{len(metrics)} runs ({errors} errors) in {wall_seconds:.1f}s, "
+          f"{len(metrics) / wall_seconds:.2f} runs/s; wrote {report_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay benchmark test cases against a chat endpoint.")
+    parser.add_argument("target", nargs="?", help="URL the test cases are POSTed to")
+    parser.add_argument("--stub", action="store_true", help="run against a local stub server instead of a target")
+    parser.add_argument("--cases", nargs="+", type=Path, help="JSONL test case files (default: the batch files)")
+    parser.add_argument("--batches-dir", type=Path, default=Path("batches"))
+    parser.add_argument("--iterations", type=int, default=1, help="times each test case is sent")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="requests in flight at most")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="open-loop arrival rate in requests per second (default: closed-loop)")
+    parser.add_argument("--arrivals", choices=ARRIVAL_PROCESSES, default="poisson",
+                        help="arrival process used with --rate")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds before a request is abandoned")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the arrival times and the stub server")
+    parser.add_argument("--results-dir", type=Path, default=Path("results"))
+    parser.add_argument("--output", type=Path, help="report directory to write (default: a new one in --results-dir)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="jsonl",
+                        help="stream results as they finish (jsonl) or write them all at the end (json)")
+    parser.add_argument("--stub-scale", type=float, default=0.01, help="factor applied to the stub's operation times")
+    parser.add_argument("--stub-error-rate", type=float, default=0.1, help="share of stub answers that are errors")
+    parser.add_argument("--stub-capacity", type=int, default=None, help="requests the stub processes at once")
+    args = parser.parse_args()
+    if not args.stub and not args.target:
+        parser.error("a target URL or --stub is required")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
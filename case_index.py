@@ -0,0 +1,169 @@
+"""Stable test-case IDs and the index joining test cases across runs.
+
+A test case's ID is a hash of what defines it: the question, its language,
+category, complexity, scenario and features, and how it is run (chat history
+depth, retry, forced data verification and AI search). These are all recorded
+in every result, so the ID of a result can be computed for any run, including
+runs recorded before the runner wrote stable IDs; the runner derives the same ID
+from the test case record it sends.
+
+For every report the index keeps, per case ID, the question and the count,
+errors, median and mean duration of its results. Looking up one case across all
+runs, or pairing the cases of two runs, is then a dictionary access instead of
+a scan of the runs' metrics.
+
+The index lives in ``results/case_index.json`` and is kept up to date like the
+run index, with which it shares its storage (see ``run_index.sync_index``):
+``python case_index.py``.
+"""
+import argparse
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import read_metrics, report_signature
+from run_index import complete_report_dirs, load_index, save_index, sync_index
+
+CASE_INDEX_FILE = "case_index.json"
+# Bump when IDs or the layout of the index entries change so runs are indexed again
+CASE_INDEX_VERSION = 2
+
+# Result fields that identify a test case, in hashing order
+CASE_FIELDS = [
+    "question", "language", "category", "complexity", "scenario_type", "features",
+    "chat_context_depth", "retry_attempt", "force_data_reason", "ai_search_pattern",
+]
+# Hex digits of the hash kept in an ID
+CASE_HASH_LENGTH = 10
+
+
+def _normalize(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NA:
+        return ""
+    if isinstance(value, (int, np.integer)) or (isinstance(value, (float, np.floating)) and float(value).is_integer()):
+        return int(value)
+    return str(value)
+
+
+def case_id(fields):
+    """Stable ID of a test case from a mapping holding its ``CASE_FIELDS``.
+
+    Missing fields count as empty. IDs read like the recorded ones,
+    ``<language>_<category>_<complexity>_<hash>``.
+    """
+    values = [_normalize(fields.get(field)) for field in CASE_FIELDS]
+    digest = hashlib.sha1(json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return f"{values[1]}_{values[2]}_{values[3]}_{digest[:CASE_HASH_LENGTH]}"
+
+
+def case_ids(df):
+    """Stable case ID of every row of a metrics DataFrame, hashing each distinct case once."""
+    columns = {field: df[field].astype("object") if field in df.columns else pd.Series("", index=df.index)
+               for field in CASE_FIELDS}
+    codes, uniques = pd.factorize(pd.MultiIndex.from_frame(pd.DataFrame(columns).fillna("")))
+    ids = np.array([case_id(dict(zip(CASE_FIELDS, values))) for values in uniques], dtype=object)
+    return pd.Series(ids[codes], index=df.index, name="case_id")
+
+
+def summarize_cases(df):
+    """Question and duration statistics of each case of a run, keyed by case ID."""
+    ids = case_ids(df).to_numpy()
+    durations = df["duration"].astype("float64").to_numpy()
+    failed = df["error_type"].notna().to_numpy()
+    questions = df["question"].astype("object").to_numpy()
+    cases = {}
+    for cid, positions in pd.Series(ids).groupby(ids, sort=False).indices.items():
+        case_durations = durations[positions]
+        cases[cid] = {
+            "question": questions[positions[0]],
+            "count": len(positions),
+            "errors": int(failed[positions].sum()),
+            "median": float(np.nanmedian(case_durations)) if not np.isnan(case_durations).all() else None,
+            "mean": float(np.nanmean(case_durations)) if not np.isnan(case_durations).all() else None,
+        }
+    return cases
+
+
+def load_case_index(results_dir="results"):
+    """Read the case index, or an empty index if it is missing or outdated."""
+    return load_index(Path(results_dir) / CASE_INDEX_FILE, CASE_INDEX_VERSION)
+
+
+def save_case_index(index, results_dir="results"):
+    """Write the case index atomically."""
+    save_index(index, Path(results_dir) / CASE_INDEX_FILE)
+
+
+def index_run(index, report_dir, df=None):
+    """Add or refresh the entry of one report in the index (in memory)."""
+    report_dir = Path(report_dir)
+    if df is None:
+        df = read_metrics(report_dir, with_text=False)
+    _, mtime_ns, size = report_signature(report_dir)
+    index["runs"][report_dir.name] = {"signature": [mtime_ns, size], "cases": summarize_cases(df)}
+
+
+def update_case_index(results_dir="results"):
+    """Index new or changed complete reports, drop removed ones, and return the index."""
+    return sync_index(Path(results_dir) / CASE_INDEX_FILE, CASE_INDEX_VERSION, index_run,
+                      complete_report_dirs(results_dir), prune=True)
+
+
+def cases_by_id(index):
+    """Invert the index to ``{case ID: {run ID: case entry}}`` for constant-time case lookups."""
+    by_case = {}
+    for run_id, run in sorted(index["runs"].items()):
+        for cid, entry in run["cases"].items():
+            by_case.setdefault(cid, {})[run_id] = entry
+    return by_case
+
+
+def case_history(by_case, cid):
+    """Statistics of one case in every run it appears in, oldest run first."""
+    runs = by_case.get(cid, {})
+    return pd.DataFrame(
+        [{"run_id": run_id, **{k: v for k, v in entry.items() if k != "question"}} for run_id, entry in runs.items()],
+        columns=["run_id", "count", "errors", "median", "mean"],
+    )
+
+
+def paired_deltas(index, baseline_run, candidate_run):
+    """Median duration of every case present in both runs and its change, largest slowdown first."""
+    baseline = index["runs"].get(baseline_run, {}).get("cases", {})
+    candidate = index["runs"].get(candidate_run, {}).get("cases", {})
+    rows = [
+        {"case_id": cid, "question": baseline[cid]["question"],
+         "baseline_median": baseline[cid]["median"], "candidate_median": candidate[cid]["median"]}
+        for cid in baseline.keys() & candidate.keys()
+    ]
+    deltas = pd.DataFrame(rows, columns=["case_id", "question", "baseline_median", "candidate_median"]).astype(
+        {"baseline_median": "float64", "candidate_median": "float64"}
+    )
+    deltas["delta"] = deltas["candidate_median"] - deltas["baseline_median"]
+    deltas["change"] = deltas["delta"] / deltas["baseline_median"]
+    return deltas.sort_values("delta", ascending=False, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring the cross-run case index up to date.")
+    parser.add_argument("--results-dir", type=Path, default=Path("results"))
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="print the per-case median changes between two runs")
+    args = parser.parse_args()
+
+    index = update_case_index(args.results_dir)
+    case_count = len(cases_by_id(index))
+    print(f"{len(index['runs'])} runs, {case_count} distinct test cases")
+    if args.compare:
+        deltas = paired_deltas(index, *(Path(run).name for run in args.compare))
+        with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 140,
+                               "display.max_rows", 50):
+            print(deltas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Critical-path reconstruction of test cases from their operation times.
+
+``operation_times`` only records how long each operation took. Laying the
+operations out one after another in pipeline order gives each test case's
+waterfall; whatever part of the total ``duration`` no operation accounts for is
+reported as unattributed time (negative when operations overlapped).
+
+Operations are grouped into the pipeline stages of ``PIPELINE_STAGES``. Across a
+run, ``tail_breakdown`` shows how the stages share the time of the slowest cases
+compared with all cases, and which stage dominates the tail. Operations missing
+from ``PIPELINE_STAGES`` are lumped into an "Other" stage and reported by
+``unmapped_operations``, so a new operation cannot skew the breakdown unnoticed.
+
+    python critical_path.py results/report_20250227_111351 --quantile 0.9
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import operation_times_frame, read_metrics
+
+# Pipeline stages in execution order, with the operations that make them up
+PIPELINE_STAGES = [
+    ("Chat Processing", ["Basic Chat Processing"]),
+    ("Intent Analysis", ["User Intent Analysis"]),
+    ("Schema Retrieval", ["Table Retrieval", "Column Extraction"]),
+    ("SQL Generation", ["Initial Query Generation", "VannaAI SQL Generation", "Query Optimization"]),
+    ("Query Execution", ["Query Execution", "Query Fixing", "Query Execution 1", "Query Execution 2"]),
+    ("Retry Analysis", ["Retry Analysis"]),
+    ("Answer Generation", ["Answer Generation", "Error Response Generation"]),
+]
+# Stage of operations that are not part of PIPELINE_STAGES
+OTHER_STAGE = "Other"
+UNATTRIBUTED = "Unattributed"
+# Cases above this duration quantile count as the tail
+DEFAULT_TAIL_QUANTILE = 0.95
+
+OPERATION_STAGES = {operation: stage for stage, operations in PIPELINE_STAGES for operation in operations}
+
+
+def pipeline_operations(operations):
+    """Order operation names by pipeline position; unknown operations go last, alphabetically."""
+    known = [op for _, ops in PIPELINE_STAGES for op in ops if op in operations]
+    return known + sorted(op for op in operations if op not in OPERATION_STAGES)
+
+
+def unmapped_operations(df):
+    """Share of the total duration taken by each operation that is not part of ``PIPELINE_STAGES``.
+
+    Returns a Series indexed by operation, largest share first; empty when every
+    operation is mapped to a stage.
+    """
+    op_times = operation_times_frame(df).astype("float64")
+    others = [op for op in op_times.columns if op not in OPERATION_STAGES]
+    shares = op_times[others].sum() / df["duration"].astype("float64").sum()
+    return shares.sort_values(ascending=False).rename("share")
+
+
+def stage_times(df):
+    """Time per pipeline stage of each test case, plus the unattributed rest of its duration.
+
+    Returns a DataFrame aligned with ``df`` with one column per stage that occurs
+    in the run (operations that did not run count as zero) and ``UNATTRIBUTED``.
+    """
+    op_times = operation_times_frame(df).astype("float64").fillna(0.0)
+    stages = {}
+    for stage, operations in PIPELINE_STAGES:
+        present = [op for op in operations if op in op_times.columns]
+        if present:
+            stages[stage] = op_times[present].sum(axis=1)
+    others = [op for op in op_times.columns if op not in OPERATION_STAGES]
+    if others:
+        stages[OTHER_STAGE] = op_times[others].sum(axis=1)
+    result = pd.DataFrame(stages, index=df.index)
+    result[UNATTRIBUTED] = df["duration"].astype("float64") - result.sum(axis=1)
+    return result
+
+
+def case_waterfall(case):
+    """Waterfall of one test case (a row of a metrics DataFrame).
+
+    Returns one row per operation that ran, in pipeline order, with its stage,
+    start offset, duration and end, followed by the unattributed remainder of
+    the case's total duration.
+    """
+    op_times = operation_times_frame(case.to_frame().T).iloc[0].astype("float64").dropna()
+    operations = pipeline_operations(list(op_times.index))
+    durations = op_times[operations].to_numpy()
+    starts = np.concatenate([[0.0], np.cumsum(durations)[:-1]])
+    waterfall = pd.DataFrame({
+        "operation": operations,
+        "stage": [OPERATION_STAGES.get(op, OTHER_STAGE) for op in operations],
+        "start": starts,
+        "duration": durations,
+    })
+    attributed = float(durations.sum())
+    unattributed = pd.DataFrame({
+        "operation": [UNATTRIBUTED],
+        "stage": [UNATTRIBUTED],
+        "start": [attributed],
+        "duration": [float(case["duration"]) - attributed],
+    })
+    waterfall = pd.concat([waterfall, unattributed], ignore_index=True)
+    waterfall["end"] = waterfall["start"] + waterfall["duration"]
+    return waterfall
+
+
+def tail_breakdown(df, quantile=DEFAULT_TAIL_QUANTILE):
+    """Compare how stages share the time of the slowest cases with all cases.
+
+    Returns a DataFrame indexed by stage with the mean seconds and share of the
+    total duration for all cases and for the tail (cases at or above the
+    ``quantile`` duration), and the number of tail cases in which the stage took
+    the most time.
+    """
+    stages = stage_times(df)
+    durations = df["duration"].astype("float64")
+    tail = durations >= durations.quantile(quantile)
+    dominant = stages[tail].clip(lower=0).idxmax(axis=1).value_counts()
+    return pd.DataFrame({
+        "mean_all": stages.mean(),
+        "share_all": stages.sum() / durations.sum(),
+        "mean_tail": stages[tail].mean(),
+        "share_tail": stages[tail].sum() / durations[tail].sum(),
+        "dominant_in_tail": dominant.reindex(stages.columns, fill_value=0),
+    }).rename_axis("stage")
+
+
+def dominant_tail_stage(breakdown, include_unattributed=False):
+    """The pipeline stage taking the largest share of the tail cases' time, or None if no operation ran."""
+    shares = breakdown["share_tail"]
+    if not include_unattributed:
+        shares = shares.drop(UNATTRIBUTED, errors="ignore")
+    return shares.idxmax() if len(shares) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Break a run's durations down by pipeline stage.")
+    parser.add_argument("report", type=Path, help="report directory")
+    parser.add_argument("--quantile", type=float, default=DEFAULT_TAIL_QUANTILE,
+                        help="duration quantile from which cases count as the tail (default: 0.95)")
+    args = parser.parse_args()
+
+    df = read_metrics(args.report, with_text=False)
+    unmapped = unmapped_operations(df)
+    for operation, share in unmapped.items():
+        print(f"Warning: operation {operation!r} ({share:.1%} of the time) has no pipeline stage; "
+              f"counted as {OTHER_STAGE}")
+    breakdown = tail_breakdown(df, args.quantile)
+    with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 120):
+        print(breakdown)
+    stage = dominant_tail_stage(breakdown)
+    if stage is None:
+        print("\nNo operation times recorded")
+        return
+    print(f"\nSlowest {(1 - args.quantile):.0%} of cases: {stage} takes "
+          f"{breakdown.loc[stage, 'share_tail']:.0%} of their time "
+          f"({breakdown.loc[stage, 'share_all']:.0%} across all cases), "
+          f"{breakdown.loc[UNATTRIBUTED, 'share_tail']:.0%} is unattributed")
+
+
+if __name__ == "__main__":
+    main()
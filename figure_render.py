@@ -0,0 +1,150 @@
+"""Rasterization of Plotly figures to PNG for the PDF export.
+
+Each ``fig.to_image`` call goes through Kaleido and takes a large part of a second,
+so figures are rendered on a bounded pool of worker processes, each with its own
+Kaleido renderer. Results come back in the order the figures were given.
+
+Rendered PNGs are kept in a content-addressed disk cache keyed by a hash of the
+figure JSON and the render size, so unchanged charts are never rendered twice.
+The cache is trimmed to ``IMAGE_CACHE_MAX_BYTES``, dropping least recently used
+images first. ``render_png_files`` hands out files rather than bytes, so a
+caller laying out many images (the PDF export) never holds them all in memory;
+they are hard links to the cache entries in a directory of the caller, so a
+trim by a concurrent export cannot delete an image still being laid out.
+
+``time_render`` times one render of a set of figures; ``generate_reports.py
+--time-render`` uses it on a report's export figures.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from itertools import repeat
+from pathlib import Path
+
+from benchmark_data import atomic_write, spawn_pool
+
+# Upper bound on rendering worker processes (each one runs its own Kaleido/Chromium)
+MAX_RENDER_WORKERS = min(os.cpu_count() or 1, 4)
+
+IMAGE_CACHE_DIR = Path(os.environ.get("BENCHMARK_IMAGE_CACHE", ".cache/figures"))
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def render_png(fig_json, width, height, scale):
+    """Rasterize a figure given as Plotly JSON to PNG bytes."""
+    import plotly.io as pio
+
+    fig = pio.from_json(fig_json, skip_invalid=True)
+    return fig.to_image(format="png", width=width, height=height, scale=scale)
+
+
+def render_png_file(fig_json, width, height, scale, path):
+    """Rasterize a figure given as Plotly JSON straight into a PNG file."""
+    write_png(path, render_png(fig_json, width, height, scale))
+    return path
+
+
+def image_cache_key(fig_json, width, height, scale):
+    """Content hash identifying a rendered image (including the Plotly version that renders it)."""
+    import plotly
+
+    digest = hashlib.sha256(fig_json.encode())
+    digest.update(f"|png|{width}|{height}|{scale}|plotly {plotly.__version__}".encode())
+    return digest.hexdigest()
+
+
+def _cache_path(key, cache_dir):
+    return Path(cache_dir) / key[:2] / f"{key}.png"
+
+
+def write_png(path, png):
+    """Write PNG bytes atomically, so readers never see partial files."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        f.write(png)
+
+
+def trim_image_cache(max_bytes=None, cache_dir=None):
+    """Delete least recently used images until the cache fits in ``max_bytes``."""
+    if max_bytes is None:
+        max_bytes = IMAGE_CACHE_MAX_BYTES
+    entries = []
+    for path in Path(cache_dir or IMAGE_CACHE_DIR).glob("*/*.png"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # Hard links are not supported here (or across devices)
+        shutil.copyfile(src, dst)
+
+
+def render_png_files(figs, out_dir, width=1000, height=500, scale=2, max_workers=None, cache_dir=None):
+    """Rasterize figures through the image cache into PNG files in ``out_dir``, returned in input order.
+
+    Images already in the cache are not rendered again. Workers write their
+    images to disk themselves, so no PNG passes through the calling process.
+    The files in ``out_dir`` belong to the caller; trimming the cache never
+    removes them.
+    """
+    if max_workers is None:
+        max_workers = MAX_RENDER_WORKERS
+    cache_dir = cache_dir or IMAGE_CACHE_DIR
+    fig_jsons = [fig.to_json() for fig in figs]
+    paths = [_cache_path(image_cache_key(fig_json, width, height, scale), cache_dir) for fig_json in fig_jsons]
+
+    # Identical figures in one batch are rendered once
+    missing = {}
+    for path, fig_json in zip(paths, fig_jsons):
+        try:
+            os.utime(path)
+        except OSError:
+            missing[path] = fig_json
+    workers = min(max_workers, len(missing))
+    if workers == 1:
+        for path, fig_json in missing.items():
+            render_png_file(fig_json, width, height, scale, path)
+    elif workers > 1:
+        with spawn_pool(workers) as pool:
+            list(pool.map(render_png_file, missing.values(), repeat(width), repeat(height), repeat(scale), missing))
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_paths = []
+    for i, (path, fig_json) in enumerate(zip(paths, fig_jsons)):
+        out_path = out_dir / f"figure_{i:03d}.png"
+        try:
+            _link_or_copy(path, out_path)
+        except FileNotFoundError:
+            # Evicted by a concurrent trim since it was rendered or found
+            render_png_file(fig_json, width, height, scale, out_path)
+        out_paths.append(out_path)
+    if missing:
+        trim_image_cache(cache_dir=cache_dir)
+    return out_paths
+
+
+def time_render(figs, workers, cache_dir, width=1000, height=500, scale=2):
+    """Seconds ``render_png_files`` takes for ``figs`` on ``workers`` processes, pool start-up included."""
+    with tempfile.TemporaryDirectory() as out_dir:
+        started = time.perf_counter()
+        render_png_files(figs, out_dir, width, height, scale, max_workers=workers, cache_dir=cache_dir)
+        return time.perf_counter() - started
+
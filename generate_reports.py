@@ -0,0 +1,162 @@
+"""Generate PDF reports for benchmark runs without the Streamlit app.
+
+Renders the same PDF as the dashboard's "Export Report to PDF" button for one or
+more report directories, several reports at a time. A report is skipped when its
+PDF is newer than its results file and summary report, unless ``--force`` is given.
+
+    python generate_reports.py                       # every report under results/
+    python generate_reports.py results/report_20250227_111351 --force
+
+``--time-render`` writes no PDF and instead times rendering a report's export
+figures in-process (one worker, as before the pool) and on the pool, from an
+empty image cache and from a warm one:
+
+    python generate_reports.py results/report_20250227_111351 --time-render 1 4
+
+No timings are recorded here yet: Kaleido needs a Chrome install, which the
+machine these changes were made on did not have.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from benchmark_data import (
+    atomic_write,
+    get_report_dirs,
+    read_metrics,
+    report_is_complete,
+    results_path,
+    spawn_pool,
+)
+
+
+def pdf_path(report_dir):
+    """Where the PDF of a report is written."""
+    report_dir = Path(report_dir)
+    return report_dir / f"benchmark_report_{report_dir.name}.pdf"
+
+
+def pdf_is_current(report_dir):
+    """Check whether the report's PDF is newer than everything it is built from."""
+    report_dir = Path(report_dir)
+    pdf = pdf_path(report_dir)
+    if not pdf.exists():
+        return False
+    inputs = [results_path(report_dir), report_dir / "visualizations" / "summary_report.md"]
+    newest_input = max(p.stat().st_mtime_ns for p in inputs if p.exists())
+    return pdf.stat().st_mtime_ns >= newest_input
+
+
+def generate_report(report_dir, render_workers=None):
+    """Render the PDF of one report and return its path."""
+    # Imported here so worker processes load the dashboard module themselves
+    from streamlit_app import export_to_pdf
+
+    report_dir = Path(report_dir)
+    df = read_metrics(report_dir, with_text=False)
+
+    # Built under a temporary name so a failed run never leaves a truncated PDF behind
+    pdf = pdf_path(report_dir)
+    with atomic_write(pdf) as f:
+        export_to_pdf(df, report_dir, render_workers=render_workers, output_path=f)
+    return pdf
+
+
+def run_reports(report_dirs, workers, render_workers=None):
+    """Generate reports on up to ``workers`` processes.
+
+    Yields ``(report_dir, pdf_path)`` as reports finish, or the raised exception
+    in place of the path when a report fails.
+    """
+    if workers <= 1:
+        for report_dir in report_dirs:
+            try:
+                yield report_dir, generate_report(report_dir, render_workers)
+            except Exception as e:
+                yield report_dir, e
+        return
+    # Spawned so each worker starts its own renderer cleanly
+    with spawn_pool(workers) as pool:
+        futures = {pool.submit(generate_report, d, render_workers): d for d in report_dirs}
+        for future in as_completed(futures):
+            yield futures[future], future.exception() or future.result()
+
+
+def time_figure_rendering(report_dir, worker_counts, repeat=3):
+    """Print the median and best render times of a report's export figures per worker count."""
+    from figure_render import time_render
+    from streamlit_app import pdf_figure_sections
+
+    sections = pdf_figure_sections(read_metrics(report_dir, with_text=False))
+    figs = [fig for _, plots in sections for _, fig in plots]
+    print(f"{report_dir}: {len(figs)} figures")
+    for workers in worker_counts:
+        cold = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                cold.append(time_render(figs, workers, cache_dir))
+        print(f"{workers} worker(s), empty cache: median {statistics.median(cold):.2f}s, best {min(cold):.2f}s")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        time_render(figs, max(worker_counts), cache_dir)
+        warm = [time_render(figs, max(worker_counts), cache_dir) for _ in range(repeat)]
+    print(f"warm cache: median {statistics.median(warm):.2f}s, best {min(warm):.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate PDF reports for benchmark runs.")
+    parser.add_argument("reports", nargs="*", type=Path, help="report directories (default: all of --results-dir)")
+    parser.add_argument("--results-dir", type=Path, default=Path("results"))
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 4),
+                        help="reports rendered at the same time")
+    parser.add_argument("--render-workers", type=int, default=None,
+                        help="figure rendering processes per report (default: 1 when rendering several reports)")
+    parser.add_argument("--force", action="store_true", help="regenerate PDFs that are already current")
+    parser.add_argument("--time-render", nargs="+", type=int, metavar="WORKERS",
+                        help="time rendering the export figures with these worker counts instead of writing PDFs")
+    parser.add_argument("--repeat", type=int, default=3, help="timed renders per worker count with --time-render")
+    args = parser.parse_args()
+
+    if args.time_render:
+        for report_dir in args.reports or get_report_dirs(args.results_dir):
+            time_figure_rendering(report_dir, args.time_render, args.repeat)
+        return 0
+
+    report_dirs = args.reports or get_report_dirs(args.results_dir)
+    pending = []
+    for report_dir in report_dirs:
+        if not results_path(report_dir).exists():
+            print(f"{report_dir}: no results file, skipped")
+        elif not report_is_complete(report_dir):
+            print(f"{report_dir}: run in progress, skipped")
+        elif pdf_is_current(report_dir) and not args.force:
+            print(f"{report_dir}: up to date")
+        else:
+            pending.append(report_dir)
+    if not pending:
+        return 0
+
+    workers = max(1, min(args.workers, len(pending)))
+    render_workers = args.render_workers
+    if render_workers is None and workers > 1:
+        # Parallelism comes from the reports; avoid nesting rendering pools inside them
+        render_workers = 1
+
+    failures = 0
+    started = time.perf_counter()
+    for report_dir, outcome in run_reports(pending, workers, render_workers):
+        if isinstance(outcome, Exception):
+            failures += 1
+            print(f"{report_dir}: failed: {outcome}", file=sys.stderr)
+        else:
+            print(f"{report_dir}: wrote {outcome}")
+    print(f"{len(pending) - failures}/{len(pending)} reports generated in {time.perf_counter() - started:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Background ingestion of new and changed reports under ``results/``.
+
+The watcher polls the ``report_*`` directories of a results directory. Once a
+report's results file has been left unchanged for ``settle_seconds`` (so runs
+still being written are not picked up) and ends like a complete JSON document,
+the report is converted to its sidecar and text store and summarized into the
+run index and the case index. The dashboard then reads every report from its
+sidecar and never parses JSON while serving a page.
+
+Streamed runs (``benchmark_results.jsonl``) are readable while they are going,
+so they are never held back as pending; they are ingested as soon as their
+summary file marks them complete.
+
+The watcher usually runs in the dashboard's process, next to page scripts that
+update the same indexes; every update of an index holds that index's lock (see
+``run_index.sync_index``). A report is ingested again whenever its results file
+changes. Reports that fail to convert are recorded in ``errors`` and retried
+once their file changes.
+
+    python ingest_watcher.py                  # watch results/ until interrupted
+    python ingest_watcher.py /tmp/results --once
+"""
+import argparse
+import logging
+import threading
+import time
+from pathlib import Path
+
+import case_index
+import run_index
+from benchmark_data import RESULTS_FILE, convert_report, report_is_complete, results_path, sidecar_is_current
+from run_index import sync_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_SECONDS = 2.0
+# A results file must be unchanged for this long before it is ingested
+DEFAULT_SETTLE_SECONDS = 5.0
+# Indexes every ingested report is summarized into: (file name, version, index_run)
+INDEXES = [
+    (run_index.RUN_INDEX_FILE, run_index.RUN_INDEX_VERSION, run_index.index_run),
+    (case_index.CASE_INDEX_FILE, case_index.CASE_INDEX_VERSION, case_index.index_run),
+]
+
+
+def looks_complete(results_file):
+    """Check whether a results file ends like a complete JSON object."""
+    with open(results_file, "rb") as f:
+        f.seek(0, 2)
+        f.seek(max(f.tell() - 64, 0))
+        return f.read().rstrip().endswith(b"}")
+
+
+class IngestWatcher:
+    """Polls a results directory and ingests reports once they are completely written.
+
+    ``clock`` returns the current wall-clock time in seconds and can be replaced
+    to drive the watcher in tests.
+    """
+
+    def __init__(self, results_dir="results", settle_seconds=DEFAULT_SETTLE_SECONDS, clock=time.time):
+        self.results_dir = Path(results_dir)
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        # Report name -> (mtime_ns, size) of the results file when it was last ingested
+        self.ingested = {}
+        # Report name -> error message of its last failed ingestion
+        self.errors = {}
+        # Reports seen with a results file that has not been ingested yet
+        self.pending = set()
+        # Incremented whenever the set of ingested reports changes
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _scan(self):
+        reports = {}
+        for report_dir in self.results_dir.glob("report_*"):
+            try:
+                stat = results_path(report_dir).stat()
+            except OSError:
+                continue
+            reports[report_dir.name] = (report_dir, (stat.st_mtime_ns, stat.st_size))
+        return reports
+
+    def ingest(self, report_dir):
+        """Convert a report to its sidecar and refresh its index entries, skipping what is current."""
+        if not sidecar_is_current(report_dir):
+            convert_report(report_dir)
+        for file_name, version, index_run in INDEXES:
+            sync_index(self.results_dir / file_name, version, index_run, [report_dir])
+
+    def poll(self):
+        """Scan the results directory once and ingest every settled report.
+
+        Returns the report directories ingested by this call.
+        """
+        now = self.clock()
+        reports = self._scan()
+        ingested = []
+        pending = set()
+        for name, (report_dir, signature) in sorted(reports.items()):
+            if self.ingested.get(name) == signature:
+                continue
+            if not report_is_complete(report_dir):
+                # A streamed run still in progress; checked again on every poll
+                continue
+            results_file = results_path(report_dir)
+            # A finished stream is complete once its summary exists; a JSON file has to settle first
+            if results_file.name == RESULTS_FILE and now - signature[0] / 1e9 < self.settle_seconds:
+                pending.add(name)
+                continue
+            try:
+                if results_file.name == RESULTS_FILE and not looks_complete(results_file):
+                    raise ValueError(f"{RESULTS_FILE} is incomplete")
+                self.ingest(report_dir)
+            except Exception as e:
+                logger.warning("Could not ingest %s: %s", report_dir, e)
+                self.errors[name] = str(e)
+            else:
+                self.errors.pop(name, None)
+                ingested.append(report_dir)
+            # Failed reports are retried once their results file changes
+            self.ingested[name] = signature
+
+        removed = set(self.ingested) - set(reports)
+        if removed:
+            for file_name, version, index_run in INDEXES:
+                sync_index(self.results_dir / file_name, version, index_run, removed=removed)
+            for name in removed:
+                del self.ingested[name]
+                self.errors.pop(name, None)
+
+        with self._lock:
+            self.pending = pending
+            if ingested or removed:
+                self.generation += 1
+        return ingested
+
+    def _run(self, poll_seconds):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling %s failed", self.results_dir)
+            self._stop.wait(poll_seconds)
+
+    def start(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        """Poll in a daemon thread until ``stop`` is called."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(poll_seconds,), name="ingest-watcher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the polling thread and wait for it to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest new and changed benchmark reports as they appear.")
+    parser.add_argument("results_dir", nargs="?", default="results", type=Path)
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_SECONDS, help="seconds between scans")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help="seconds a results file must stay unchanged before it is ingested")
+    parser.add_argument("--once", action="store_true", help="scan once and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    watcher = IngestWatcher(args.results_dir, settle_seconds=args.settle)
+    if args.once:
+        for report_dir in watcher.poll():
+            logger.info("Ingested %s", report_dir)
+        return
+    try:
+        while True:
+            for report_dir in watcher.poll():
+                logger.info("Ingested %s", report_dir)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
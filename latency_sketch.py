@@ -0,0 +1,128 @@
+"""Mergeable latency sketch with relative-error quantiles.
+
+Values are counted in logarithmically sized buckets (the DDSketch scheme), so any
+quantile is reported within ``relative_accuracy`` of the true value, the sketch
+size grows only with the range of values, and two sketches merge by adding their
+bucket counts. This lets percentiles be combined across runs and categories
+without keeping the raw durations.
+"""
+import math
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# Values at or below this (in seconds) are counted as zero
+MIN_TRACKED_VALUE = 1e-6
+
+
+class LatencySketch:
+    """Quantile sketch over non-negative values such as durations in seconds."""
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        """Add a single value to the sketch."""
+        self.add_many([value])
+
+    def add_many(self, values):
+        """Add an array of values to the sketch, ignoring NaN."""
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        tracked = values[values > MIN_TRACKED_VALUE]
+        self.zero_count += len(values) - len(tracked)
+        keys, counts = np.unique(
+            np.ceil(np.log(tracked) / self._log_gamma).astype("int64"),
+            return_counts=True,
+        )
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def merge(self, other):
+        """Add the counts of another sketch with the same accuracy to this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, sketches, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """Return a new sketch combining all given sketches."""
+        result = cls(relative_accuracy)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def quantile(self, q):
+        """Estimate the ``q`` quantile (0 <= q <= 1), or NaN for an empty sketch."""
+        if not self.count:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs):
+        """Estimate several quantiles at once."""
+        return [self.quantile(q) for q in qs]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def to_dict(self):
+        """Serialize the sketch to a JSON-compatible dict."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(key): count for key, count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch serialized with ``to_dict``."""
+        sketch = cls(data["relative_accuracy"])
+        sketch.bins = {int(key): count for key, count in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
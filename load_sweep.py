@@ -0,0 +1,230 @@
+"""Throughput and saturation sweeps of the chat endpoint.
+
+Replays the benchmark test cases (``benchmark.jsonl`` by default) at a series of
+load levels, either offered request rates (open-loop, ``--qps``) or
+concurrency levels (closed-loop, ``--concurrency-levels``), using
+``benchmark_runner``. For every step the sweep records the achieved throughput,
+latency percentiles and error rate, overall and per complexity and AI search
+mode, and it locates the knee of the latency-vs-throughput curve: the step
+after which more load buys little throughput and mostly adds latency.
+
+Sweeps are saved as ``results/sweep_<timestamp>.json`` and plotted on the
+dashboard's Load Testing tab.
+
+    python load_sweep.py http://localhost:8000/chat --qps 0.5 1 2 4 8
+    python load_sweep.py --stub --stub-capacity 4 --concurrency-levels 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import atomic_write
+from benchmark_runner import DEFAULT_TIMEOUT, StubServer, http_target, load_test_cases, run_benchmark
+from run_index import PERCENTILES
+
+SWEEP_PREFIX = "sweep_"
+# Concurrency cap of open-loop steps, high enough not to throttle the offered rate
+DEFAULT_QPS_CONCURRENCY = 64
+# Latency percentile the knee is located on
+KNEE_PERCENTILE = 95
+# Open-loop steps achieving less than this share of the offered rate are saturated
+SATURATION_RATIO = 0.9
+# Groupings of the test cases that get their own curves
+SWEEP_GROUPS = ["complexity", "ai_search"]
+
+
+def ai_search_label(metric):
+    """Label a result "AI Search" or "Normal Flow", as the AI Search Analysis tab does."""
+    return "AI Search" if metric.get("ai_search_pattern") else "Normal Flow"
+
+
+def step_stats(metrics, wall_seconds):
+    """Throughput, error rate and latency percentiles of a group of results from one step."""
+    durations = np.array([m["duration"] for m in metrics], dtype="float64")
+    errors = sum(m["error_type"] is not None for m in metrics)
+    stats = {
+        "requests": len(metrics),
+        "errors": errors,
+        "error_rate": errors / len(metrics) if metrics else None,
+        "throughput": len(metrics) / wall_seconds,
+        "goodput": (len(metrics) - errors) / wall_seconds,
+        "mean": float(durations.mean()) if len(durations) else None,
+    }
+    for p in PERCENTILES:
+        stats[f"p{p}"] = float(np.percentile(durations, p)) if len(durations) else None
+    return stats
+
+
+def summarize_step(metrics, wall_seconds):
+    """Statistics of one step overall and per value of each of ``SWEEP_GROUPS``."""
+    labels = {
+        "complexity": lambda m: m["complexity"],
+        "ai_search": ai_search_label,
+    }
+    groups = {}
+    for group in SWEEP_GROUPS:
+        by_value = {}
+        for metric in metrics:
+            by_value.setdefault(labels[group](metric), []).append(metric)
+        groups[group] = {value: step_stats(group_metrics, wall_seconds) for value, group_metrics in sorted(by_value.items())}
+    return {**step_stats(metrics, wall_seconds), "wall_seconds": wall_seconds, "groups": groups}
+
+
+def find_knee(throughputs, latencies):
+    """Index of the knee of a latency-vs-throughput curve, or None.
+
+    Both axes are scaled to [0, 1] over the steps; the knee is the step lying
+    furthest below the chord from the first to the last step (the Kneedle
+    method), i.e. close to the highest throughput while latency is still low.
+    """
+    x = np.asarray(throughputs, dtype="float64")
+    y = np.asarray(latencies, dtype="float64")
+    if len(x) < 3 or np.isnan(x).any() or np.isnan(y).any() or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return None
+    x = (x - x.min()) / np.ptp(x)
+    y = (y - y.min()) / np.ptp(y)
+    distance = x - y
+    knee = int(np.argmax(distance))
+    return knee if distance[knee] > 0 else None
+
+
+async def run_sweep(cases, send, levels, mode="qps", iterations=1, concurrency=DEFAULT_QPS_CONCURRENCY,
+                    arrivals="poisson", timeout=DEFAULT_TIMEOUT, seed=0, on_step=None):
+    """Run the test cases once per load level, from the lowest, and summarize every step.
+
+    In ``"qps"`` mode the levels are offered request rates and at most
+    ``concurrency`` requests are in flight; in ``"concurrency"`` mode the levels
+    are closed-loop concurrency limits.
+    """
+    steps = []
+    for level in sorted(levels):
+        started = time.perf_counter()
+        if mode == "qps":
+            metrics = await run_benchmark(cases, send, iterations=iterations, concurrency=concurrency, rate=level,
+                                          arrivals=arrivals, timeout=timeout, seed=seed)
+        else:
+            metrics = await run_benchmark(cases, send, iterations=iterations, concurrency=int(level),
+                                          timeout=timeout, seed=seed)
+        step = {"level": level, **summarize_step(metrics, time.perf_counter() - started)}
+        if mode == "qps":
+            step["offered_qps"] = level
+            step["saturated"] = step["throughput"] < SATURATION_RATIO * level
+        steps.append(step)
+        if on_step is not None:
+            on_step(step)
+
+    knee = find_knee([s["throughput"] for s in steps], [s[f"p{KNEE_PERCENTILE}"] for s in steps])
+    return {"mode": mode, "steps": steps, "knee": knee}
+
+
+def sweep_frame(sweep, group=None):
+    """Steps of a sweep as a DataFrame, one row per step (and group value when ``group`` is given)."""
+    rows = []
+    for i, step in enumerate(sweep["steps"]):
+        if group is None:
+            rows.append({"step": i, "level": step["level"], **{k: v for k, v in step.items() if k not in ("level", "groups")}})
+            continue
+        for value, stats in step["groups"].get(group, {}).items():
+            rows.append({"step": i, "level": step["level"], group: value, **stats})
+    return pd.DataFrame(rows)
+
+
+def get_sweep_files(results_dir="results"):
+    """Saved sweeps, newest first."""
+    return sorted(Path(results_dir).glob(f"{SWEEP_PREFIX}*.json"), reverse=True)
+
+
+def load_sweep(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_sweep(sweep, path):
+    """Write a sweep file atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump(sweep, f, indent=2)
+    return path
+
+
+def print_step(step):
+    print(f"level {step['level']:g}: {step['throughput']:.2f} req/s, "
+          f"p50 {step['p50']:.2f}s, p{KNEE_PERCENTILE} {step[f'p{KNEE_PERCENTILE}']:.2f}s, "
+          f"errors {step['error_rate']:.1%}" + (" (saturated)" if step.get("saturated") else ""))
+
+
+async def run(args):
+    cases = load_test_cases(args.cases)
+    if not cases:
+        raise SystemExit("No test cases found")
+    mode, levels = ("qps", args.qps) if args.qps else ("concurrency", args.concurrency_levels)
+
+    stub = None
+    target = args.target
+    if args.stub:
+        stub = await StubServer(args.stub_scale, args.stub_error_rate, args.seed, args.stub_capacity).start()
+        target = stub.url
+    try:
+        sweep = await run_sweep(
+            cases, http_target(target), levels, mode=mode, iterations=args.iterations,
+            concurrency=args.concurrency, arrivals=args.arrivals, timeout=args.timeout, seed=args.seed,
+            on_step=print_step,
+        )
+    finally:
+        if stub is not None:
+            await stub.close()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sweep.update({
+        "timestamp": timestamp,
+        "target": target,
+        "test_cases": len(cases),
+        "iterations": args.iterations,
+        "concurrency": args.concurrency if mode == "qps" else None,
+        "arrivals": args.arrivals if mode == "qps" else None,
+        "timeout": args.timeout,
+        "knee_percentile": KNEE_PERCENTILE,
+    })
+    path = save_sweep(sweep, args.output or args.results_dir / f"{SWEEP_PREFIX}{timestamp}.json")
+    if sweep["knee"] is None:
+        print(f"No knee found; wrote {path}")
+    else:
+        knee = sweep["steps"][sweep["knee"]]
+        print(f"Knee at level {knee['level']:g}: {knee['throughput']:.2f} req/s, "
+              f"p{KNEE_PERCENTILE} {knee[f'p{KNEE_PERCENTILE}']:.2f}s; wrote {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep offered load against a chat endpoint and find its knee.")
+    parser.add_argument("target", nargs="?", help="URL the test cases are POSTed to")
+    parser.add_argument("--stub", action="store_true", help="run against a local stub server instead of a target")
+    levels = parser.add_mutually_exclusive_group(required=True)
+    levels.add_argument("--qps", nargs="+", type=float, help="offered request rates, one step each (open-loop)")
+    levels.add_argument("--concurrency-levels", nargs="+", type=int, help="concurrency limits, one step each (closed-loop)")
+    parser.add_argument("--cases", nargs="+", type=Path, default=[Path("benchmark.jsonl")], help="JSONL test case files")
+    parser.add_argument("--iterations", type=int, default=1, help="times each test case is sent per step")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_QPS_CONCURRENCY,
+                        help="requests in flight at most during --qps steps")
+    parser.add_argument("--arrivals", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds before a request is abandoned")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results-dir", type=Path, default=Path("results"))
+    parser.add_argument("--output", type=Path, help="sweep file to write (default: a new one in --results-dir)")
+    parser.add_argument("--stub-scale", type=float, default=0.01, help="factor applied to the stub's operation times")
+    parser.add_argument("--stub-error-rate", type=float, default=0.1, help="share of stub answers that are errors")
+    parser.add_argument("--stub-capacity", type=int, default=None, help="requests the stub processes at once")
+    args = parser.parse_args()
+    if not args.stub and not args.target:
+        parser.error("a target URL or --stub is required")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Statistical regression detection between two benchmark runs.
+
+The duration and every operation time of a baseline and a candidate run are
+compared overall and per value of a dimension (``category`` by default):
+
+- Test cases are paired across the runs by their stable case ID (see
+  ``case_index``), using each case's median over its iterations. A bootstrap
+  over the pairs gives a confidence interval of the mean per-case difference,
+  relative to the mean baseline value; metrics with too few pairs resample
+  each run's rows instead. This interval is of a different statistic than the
+  relative change of the medians reported next to it.
+  Resampling is vectorized with NumPy, all metrics of a group at once.
+- With enough pairs, a Wilcoxon signed-rank test on the per-case median
+  differences gives the p-value, so the test respects the pairing and counts
+  each case once however many iterations it ran. The unpaired fallback uses a
+  Mann-Whitney U test on all rows instead. Both use the normal approximation
+  with tie correction; p-values are adjusted with Benjamini-Hochberg across
+  every comparison.
+
+A comparison is a regression when the adjusted p-value is below ``alpha``, the
+whole confidence interval of the mean change lies above zero and the median
+grew by at least ``min_effect``; improvements are the mirror image.
+
+    python regression.py results/report_A results/report_B --output verdict.json
+
+exits with status 1 when any regression is flagged.
+"""
+import argparse
+import json
+import math
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import operation_times_frame, read_metrics
+from case_index import case_ids
+
+DEFAULT_ALPHA = 0.05
+# Smallest relative change of the median reported as a regression or improvement
+DEFAULT_MIN_EFFECT = 0.05
+BOOTSTRAP_SAMPLES = 2_000
+CONFIDENCE = 0.95
+# Comparisons with fewer rows than this in either run are not tested
+MIN_SAMPLES = 5
+# Row draws made at once while bootstrapping, bounding the memory of a batch
+BOOTSTRAP_BATCH_DRAWS = 4_000_000
+
+DURATION_METRIC = "duration"
+# median_change is the relative change of the medians; mean_change_low/high bound
+# the relative change of the mean (see the module docstring)
+RESULT_COLUMNS = [
+    "group", "metric", "baseline_n", "candidate_n", "pairs",
+    "baseline_median", "candidate_median", "median_change", "mean_change_low", "mean_change_high",
+    "p_value", "p_adjusted", "verdict",
+]
+
+
+def timing_frame(df):
+    """Duration and operation times of a metrics DataFrame, one float64 column per metric."""
+    times = operation_times_frame(df)
+    times.insert(0, DURATION_METRIC, df["duration"].to_numpy())
+    return times.astype("float64")
+
+
+def average_ranks(values):
+    """Ranks of ``values`` (1-based), ties sharing their average rank; also returns the tie sizes."""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return (ends - (counts - 1) / 2)[inverse], counts
+
+
+def mann_whitney(x, y):
+    """Two-sided Mann-Whitney U test of two samples; returns ``(u, p_value)``."""
+    n1, n2 = len(x), len(y)
+    ranks, ties = average_ranks(np.concatenate([x, y]))
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1)))
+    if variance <= 0:
+        return float(u), 1.0
+    delta = u - n1 * n2 / 2
+    z = (abs(delta) - 0.5) / math.sqrt(variance)
+    return float(u), min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def wilcoxon_signed_rank(differences):
+    """Two-sided Wilcoxon signed-rank test of paired differences; returns ``(w, p_value)``.
+
+    Zero differences are dropped; ``w`` is the rank sum of the positive ones.
+    """
+    d = np.asarray(differences, dtype="float64")
+    d = d[d != 0]
+    n = len(d)
+    if not n:
+        return 0.0, 1.0
+    ranks, ties = average_ranks(np.abs(d))
+    w = ranks[d > 0].sum()
+    variance = n * (n + 1) * (2 * n + 1) / 24 - (ties ** 3 - ties).sum() / 48
+    if variance <= 0:
+        return float(w), 1.0
+    z = (abs(w - n * (n + 1) / 4) - 0.5) / math.sqrt(variance)
+    return float(w), min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def bootstrap_means(values, rng, samples=BOOTSTRAP_SAMPLES):
+    """Bootstrap distribution of the column means of ``values`` (rows x metrics, NaN where missing).
+
+    Each resample draws ``len(values)`` rows with replacement. The draws are
+    counted per row, so one matrix product yields the means of every column;
+    resamples are drawn in batches of about ``BOOTSTRAP_BATCH_DRAWS`` draws.
+    """
+    n = len(values)
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    means = np.empty((samples, values.shape[1]))
+    batch = max(1, min(samples, BOOTSTRAP_BATCH_DRAWS // max(n, 1)))
+    for start in range(0, samples, batch):
+        size = min(batch, samples - start)
+        draws = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+        counts = np.bincount(draws.ravel(), minlength=size * n).reshape(size, n).astype("float64")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[start:start + size] = (counts @ filled) / (counts @ present)
+    return means
+
+
+def _interval(distribution, confidence=CONFIDENCE):
+    tail = (1 - confidence) / 2 * 100
+    with warnings.catch_warnings():
+        # Columns without any values give an all-NaN interval
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanpercentile(distribution, [tail, 100 - tail], axis=0)
+
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg adjusted p-values (NaN entries are left out and stay NaN)."""
+    p_values = np.asarray(p_values, dtype="float64")
+    adjusted = np.full_like(p_values, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    if not len(tested):
+        return adjusted
+    order = tested[np.argsort(p_values[tested])]
+    scaled = p_values[order] * len(order) / np.arange(1, len(order) + 1)
+    adjusted[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1.0)
+    return adjusted
+
+
+def compare_group(baseline, candidate, rng):
+    """Compare every metric of one group of test cases between two runs.
+
+    ``baseline`` and ``candidate`` are timing frames (see ``timing_frame``)
+    indexed by stable case ID. Returns one result row per metric, without the
+    adjusted p-value and verdict.
+    """
+    metrics = list(baseline.columns)
+    base_counts = baseline.notna().sum().to_numpy()
+    cand_counts = candidate.notna().sum().to_numpy()
+
+    # Pair cases by their median over iterations
+    base_medians = baseline.groupby(level=0).median()
+    cand_medians = candidate.groupby(level=0).median()
+    shared = base_medians.index.intersection(cand_medians.index)
+    diffs = (cand_medians.loc[shared] - base_medians.loc[shared]).to_numpy()
+    pairs = (~np.isnan(diffs)).sum(axis=0)
+    if len(shared):
+        paired_low, paired_high = _interval(bootstrap_means(diffs, rng))
+    else:
+        paired_low = paired_high = np.full(len(metrics), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        paired_scale = np.nanmean(np.where(np.isnan(diffs), np.nan, base_medians.loc[shared].to_numpy()), axis=0)
+
+    # Metrics with too few pairs fall back to resampling the runs' rows independently
+    unpaired = (pairs < MIN_SAMPLES) & (base_counts >= MIN_SAMPLES) & (cand_counts >= MIN_SAMPLES)
+    if unpaired.any():
+        columns = np.flatnonzero(unpaired)
+        base_values = baseline.iloc[:, columns].to_numpy()
+        cand_values = candidate.iloc[:, columns].to_numpy()
+        unpaired_low, unpaired_high = _interval(
+            bootstrap_means(cand_values, rng) - bootstrap_means(base_values, rng)
+        )
+        unpaired_scale = np.nanmean(base_values, axis=0)
+
+    rows = []
+    for i, metric in enumerate(metrics):
+        x = baseline[metric].dropna().to_numpy()
+        y = candidate[metric].dropna().to_numpy()
+        row = {
+            "metric": metric,
+            "baseline_n": len(x),
+            "candidate_n": len(y),
+            "pairs": int(pairs[i]),
+            "baseline_median": float(np.median(x)) if len(x) else math.nan,
+            "candidate_median": float(np.median(y)) if len(y) else math.nan,
+            "median_change": math.nan,
+            "mean_change_low": math.nan,
+            "mean_change_high": math.nan,
+            "p_value": math.nan,
+        }
+        rows.append(row)
+        if len(x) < MIN_SAMPLES or len(y) < MIN_SAMPLES:
+            continue
+        if row["baseline_median"] > 0:
+            row["median_change"] = row["candidate_median"] / row["baseline_median"] - 1
+        if unpaired[i]:
+            _, row["p_value"] = mann_whitney(x, y)
+            j = np.searchsorted(columns, i)
+            low, high, scale = unpaired_low[j], unpaired_high[j], unpaired_scale[j]
+        else:
+            d = diffs[:, i]
+            _, row["p_value"] = wilcoxon_signed_rank(d[~np.isnan(d)])
+            low, high, scale = paired_low[i], paired_high[i], paired_scale[i]
+        if scale > 0:
+            # Relative to the baseline mean: an interval of the mean change, not of median_change
+            row["mean_change_low"], row["mean_change_high"] = float(low / scale), float(high / scale)
+    return rows
+
+
+def _verdict(row, alpha, min_effect):
+    if math.isnan(row["p_adjusted"]):
+        return "insufficient data"
+    if row["p_adjusted"] < alpha and row["mean_change_low"] > 0 and row["median_change"] >= min_effect:
+        return "regression"
+    if row["p_adjusted"] < alpha and row["mean_change_high"] < 0 and row["median_change"] <= -min_effect:
+        return "improvement"
+    return "no change"
+
+
+def compare_runs(baseline, candidate, dimension="category", alpha=DEFAULT_ALPHA,
+                 min_effect=DEFAULT_MIN_EFFECT, seed=0):
+    """Compare the timings of two runs' metrics DataFrames, overall and per value of ``dimension``.
+
+    Returns one row per group and metric with the medians and their relative
+    change, the bootstrap interval of the relative mean change, raw and adjusted
+    p-values and the verdict.
+    """
+    rng = np.random.default_rng(seed)
+    base_times = timing_frame(baseline).set_axis(case_ids(baseline).to_numpy())
+    cand_times = timing_frame(candidate).set_axis(case_ids(candidate).to_numpy())
+    metrics = [m for m in base_times.columns if m in cand_times.columns]
+
+    groups = [("overall", np.ones(len(baseline), bool), np.ones(len(candidate), bool))]
+    if dimension is not None and dimension in baseline.columns and dimension in candidate.columns:
+        base_values = baseline[dimension].astype(str).to_numpy()
+        cand_values = candidate[dimension].astype(str).to_numpy()
+        for value in sorted(set(base_values) & set(cand_values)):
+            groups.append((value, base_values == value, cand_values == value))
+
+    rows = [
+        {"group": group, **row}
+        for group, base_mask, cand_mask in groups
+        for row in compare_group(base_times.loc[base_mask, metrics], cand_times.loc[cand_mask, metrics], rng)
+    ]
+    results = pd.DataFrame(rows)
+    results["p_adjusted"] = benjamini_hochberg(results["p_value"])
+    results["verdict"] = [_verdict(row, alpha, min_effect) for row in results.to_dict("records")]
+    return results[RESULT_COLUMNS]
+
+
+def regression_verdict(results, baseline_id=None, candidate_id=None, dimension="category",
+                       alpha=DEFAULT_ALPHA, min_effect=DEFAULT_MIN_EFFECT):
+    """Machine-readable summary of ``compare_runs`` results."""
+    def records(verdict):
+        flagged = results[results["verdict"] == verdict]
+        return json.loads(flagged.to_json(orient="records"))
+
+    regressions = records("regression")
+    return {
+        "baseline": baseline_id,
+        "candidate": candidate_id,
+        "dimension": dimension,
+        "alpha": alpha,
+        "min_effect": min_effect,
+        "verdict": "regression" if regressions else "pass",
+        "regressions": regressions,
+        "improvements": records("improvement"),
+        "comparisons": len(results),
+        "tested": int(results["p_value"].notna().sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect latency regressions between two benchmark runs.")
+    parser.add_argument("baseline", type=Path, help="report directory of the baseline run")
+    parser.add_argument("candidate", type=Path, help="report directory of the candidate run")
+    parser.add_argument("--dimension", default="category", help="column compared per value (default: category)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    parser.add_argument("--min-effect", type=float, default=DEFAULT_MIN_EFFECT,
+                        help="smallest relative median change flagged (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the verdict JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = compare_runs(
+        read_metrics(args.baseline, with_text=False),
+        read_metrics(args.candidate, with_text=False),
+        dimension=args.dimension,
+        alpha=args.alpha,
+        min_effect=args.min_effect,
+        seed=args.seed,
+    )
+    verdict = regression_verdict(results, args.baseline.name, args.candidate.name,
+                                 args.dimension, args.alpha, args.min_effect)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(verdict, f, indent=2)
+    else:
+        print(json.dumps(verdict, indent=2))
+    return 1 if verdict["verdict"] == "regression" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""Crash-safe streaming of a run's results, and following a run while it is going.
+
+``MetricsStreamWriter`` appends each result to the report's
+``benchmark_results.jsonl`` as one JSON line as soon as it is known, flushing it
+for readers right away and fsyncing in batches, so a crash loses at most the
+last unsynced batch instead of the whole run. The summary goes to a separate
+``benchmark_summary.json`` when the run completes; its presence marks the run
+as finished.
+
+``RunTail`` follows a stream from where it last stopped reading and keeps
+running aggregates of the results read so far, so a dashboard can refresh an
+in-progress run by reading only the new lines. It also remembers where each
+result's line starts, so the free text of one result is read back from its
+line alone.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import (
+    RESULTS_STREAM_FILE,
+    SUMMARY_FILE,
+    TEXT_COLUMNS,
+    atomic_write,
+    create_metrics_df,
+    operation_times_frame,
+    read_metrics_stream_lines,
+)
+from latency_sketch import LatencySketch
+
+# Records appended between two fsyncs at most
+DEFAULT_SYNC_RECORDS = 50
+# Seconds between two fsyncs at most while records are appended
+DEFAULT_SYNC_SECONDS = 1.0
+# Columns whose values get their own running counts in a RunTail
+TAIL_DIMENSIONS = ["complexity", "language", "scenario_type", "category"]
+# Latest results whose durations a RunTail keeps for its recent percentiles
+RECENT_WINDOW = 50
+# Rows a RunTail's column buffers start with; when full they grow to twice the rows needed
+INITIAL_TAIL_ROWS = 1024
+
+
+def write_summary(report_dir, summary):
+    """Write a run's summary file atomically, marking the run as complete."""
+    path = Path(report_dir) / SUMMARY_FILE
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    return path
+
+
+class MetricsStreamWriter:
+    """Appends metric records to a report's metrics stream.
+
+    Every record is written as one line and flushed immediately; the file is
+    fsynced after ``sync_records`` records or ``sync_seconds`` seconds, whichever
+    comes first, and on ``close``. Reopening a stream continues it, dropping a
+    last line left incomplete by a crash.
+    """
+
+    def __init__(self, report_dir, sync_records=DEFAULT_SYNC_RECORDS, sync_seconds=DEFAULT_SYNC_SECONDS,
+                 clock=time.monotonic):
+        self.report_dir = Path(report_dir)
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.report_dir / RESULTS_STREAM_FILE
+        self.sync_records = sync_records
+        self.sync_seconds = sync_seconds
+        self.clock = clock
+        self._file = open(self.path, "ab")
+        self._truncate_incomplete_line()
+        self._unsynced = 0
+        self._last_sync = clock()
+
+    def _truncate_incomplete_line(self):
+        size = self._file.seek(0, os.SEEK_END)
+        if not size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(max(size - 1, 0))
+            if f.read(1) == b"\n":
+                return
+            # Find the end of the last complete line
+            end = size
+            while end > 0:
+                start = max(end - 65536, 0)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+        self._file.truncate(end)
+
+    def append(self, record):
+        """Append one metric record, fsyncing when a batch is due."""
+        self._file.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.sync_records or self.clock() - self._last_sync >= self.sync_seconds:
+            self.sync()
+
+    def sync(self):
+        """Flush and fsync the records appended so far."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = self.clock()
+
+    def close(self, summary=None):
+        """Sync and close the stream; with a ``summary``, also write the summary file."""
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+        if summary is not None:
+            write_summary(self.report_dir, summary)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RunTail:
+    """Follows a report's metrics stream and aggregates the results read so far.
+
+    Each ``poll`` reads only the lines appended since the previous one and adds
+    them to the running count, error count, duration sum and latency sketches
+    (overall, per operation, and per value of ``TAIL_DIMENSIONS``). The
+    durations of the latest ``RECENT_WINDOW`` results are kept as well, so a
+    latency blow-up shows in the recent percentiles before it moves the run's
+    totals, and ``history`` records the running statistics after every poll that
+    read new results. The metrics read so far, without the free-text columns,
+    are available from ``frame``, and the free-text fields of single results
+    from ``text_fields``. A tail may be polled from several threads.
+    """
+
+    def __init__(self, report_dir):
+        self.report_dir = Path(report_dir)
+        self.path = self.report_dir / RESULTS_STREAM_FILE
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.count = 0
+        self.errors = 0
+        self.duration_sum = 0.0
+        self.sketch = LatencySketch()
+        self.operations = {}
+        # Dimension -> value -> {"count", "errors", "duration_sum"}
+        self.by_dimension = {dimension: {} for dimension in TAIL_DIMENSIONS}
+        self.updated_at = None
+        self.history = []
+        self._recent = np.empty(0)
+        self._columns = _ColumnBuffers()
+        # (start, end) byte span of the stream line of every row read
+        self._line_spans = []
+        self._frame = None
+
+    @property
+    def complete(self):
+        """Whether the run has finished writing its summary."""
+        return (self.report_dir / SUMMARY_FILE).exists()
+
+    def poll(self):
+        """Read and aggregate the records appended since the last poll.
+
+        Returns the number of new records. If the stream was replaced by a
+        shorter file, the tail starts over from the beginning.
+        """
+        with self._lock:
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                return 0
+            if size < self.offset:
+                self._reset()
+            if size == self.offset:
+                return 0
+            records, spans, self.offset = read_metrics_stream_lines(self.path, self.offset)
+            self._line_spans.extend(spans)
+            if records:
+                self._add(create_metrics_df({"metrics": records}).drop(columns=TEXT_COLUMNS, errors="ignore"))
+                self.history.append({"time": self.updated_at, **self._stats()})
+            return len(records)
+
+    def _add(self, chunk):
+        durations = chunk["duration"].astype("float64")
+        failed = chunk["error_type"].notna()
+        self.count += len(chunk)
+        self.errors += int(failed.sum())
+        self.duration_sum += float(durations.sum())
+        self.sketch.add_many(durations.to_numpy())
+        self._recent = np.concatenate([self._recent, durations.dropna().to_numpy()])[-RECENT_WINDOW:]
+        for operation, times in operation_times_frame(chunk).items():
+            self.operations.setdefault(operation, LatencySketch()).add_many(times.to_numpy())
+        for dimension, values in self.by_dimension.items():
+            if dimension not in chunk.columns:
+                continue
+            grouped = pd.DataFrame({"value": chunk[dimension].astype("object"), "duration": durations, "failed": failed})
+            for value, group in grouped.groupby("value"):
+                totals = values.setdefault(str(value), {"count": 0, "errors": 0, "duration_sum": 0.0})
+                totals["count"] += len(group)
+                totals["errors"] += int(group["failed"].sum())
+                totals["duration_sum"] += float(group["duration"].sum())
+        self._columns.append(chunk)
+        self._frame = None
+        self.updated_at = time.time()
+
+    def frame(self):
+        """The metrics read so far as one DataFrame (without the free-text columns).
+
+        The frame shares its rows with the tail's buffers, so building it after a
+        poll does not copy the rows read before; it must not be modified in place.
+        Free-text columns other than the categoricals are object columns.
+        """
+        with self._lock:
+            if self._frame is None:
+                if not self._columns.length:
+                    return create_metrics_df({"metrics": []})
+                self._frame = self._columns.frame()
+            return self._frame
+
+    def text_fields(self, positions):
+        """Free-text fields of the rows at ``positions``, each parsed from its own line of the stream.
+
+        Returns a DataFrame of ``TEXT_COLUMNS`` indexed by position, like ``benchmark_data.read_texts``.
+        """
+        positions = list(positions)
+        with self._lock:
+            for position in positions:
+                if not 0 <= position < len(self._line_spans):
+                    raise IndexError(f"row {position} out of range for {len(self._line_spans)} rows")
+            spans = [self._line_spans[position] for position in positions]
+        records = []
+        with open(self.path, "rb") as f:
+            for start, end in spans:
+                f.seek(start)
+                records.append(json.loads(f.read(end - start)))
+        return pd.DataFrame(records, index=positions, columns=TEXT_COLUMNS)
+
+    def _stats(self):
+        recent = len(self._recent) > 0
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else None,
+            "mean": self.duration_sum / self.count if self.count else None,
+            "p50": self.sketch.quantile(0.5) if self.count else None,
+            "p95": self.sketch.quantile(0.95) if self.count else None,
+            "p99": self.sketch.quantile(0.99) if self.count else None,
+            "recent_p50": float(np.percentile(self._recent, 50)) if recent else None,
+            "recent_p95": float(np.percentile(self._recent, 95)) if recent else None,
+        }
+
+    def stats(self):
+        """Running totals of the results read so far, and percentiles of the latest ``RECENT_WINDOW``."""
+        with self._lock:
+            return self._stats()
+
+    def operation_stats(self):
+        """Count, P50 and P95 of each operation's time over the results read so far."""
+        with self._lock:
+            return pd.DataFrame([
+                {"operation": operation, "count": sketch.count,
+                 "p50": sketch.quantile(0.5), "p95": sketch.quantile(0.95)}
+                for operation, sketch in self.operations.items() if sketch.count
+            ], columns=["operation", "count", "p50", "p95"])
+
+    def dimension_stats(self, dimension):
+        """Count, error rate and mean duration per value of one of ``TAIL_DIMENSIONS``."""
+        with self._lock:
+            return pd.DataFrame([
+                {dimension: value, "count": totals["count"], "error_rate": totals["errors"] / totals["count"],
+                 "mean": totals["duration_sum"] / totals["count"]}
+                for value, totals in sorted(self.by_dimension.get(dimension, {}).items())
+            ], columns=[dimension, "count", "error_rate", "mean"])
+
+
+class _ColumnBuffers:
+    """Columns of a growing metrics frame in arrays that double in size when full.
+
+    Appending a chunk copies only the chunk's rows; ``frame`` wraps the filled
+    part of the arrays without copying. Categorical columns keep codes into
+    categories that only ever grow, integer columns a missing-value mask, and
+    other non-numeric columns become object arrays. Rows of a column that a
+    chunk lacks are missing.
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.capacity = 0
+        # Column name -> {"kind", "values", and "categories" or "mask"}
+        self.columns = {}
+
+    @staticmethod
+    def _kind(series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return "category"
+        if pd.api.types.is_integer_dtype(series.dtype):
+            return "integer"
+        if pd.api.types.is_float_dtype(series.dtype):
+            return "float"
+        return "object"
+
+    @staticmethod
+    def _codes_dtype(category_count):
+        # The code width pandas picks for this many categories, so frames share the codes without a cast
+        for dtype in (np.int8, np.int16, np.int32):
+            if category_count < np.iinfo(dtype).max:
+                return np.dtype(dtype)
+        return np.dtype(np.int64)
+
+    def _empty(self, kind, dtype, size):
+        if kind == "category":
+            return {"kind": kind, "values": np.full(size, -1, dtype=dtype or self._codes_dtype(0)),
+                    "categories": pd.Index([], dtype="object")}
+        if kind == "integer":
+            return {"kind": kind, "values": np.zeros(size, dtype=dtype), "mask": np.ones(size, dtype=bool)}
+        if kind == "float":
+            return {"kind": kind, "values": np.full(size, np.nan, dtype=dtype)}
+        return {"kind": kind, "values": np.full(size, None, dtype=object)}
+
+    def _grow(self, rows):
+        capacity = max(2 * rows, INITIAL_TAIL_ROWS)
+        for column in self.columns.values():
+            for key in ("values", "mask"):
+                if key in column:
+                    old = column[key]
+                    new = self._empty(column["kind"], old.dtype, capacity)[key]
+                    new[:self.length] = old[:self.length]
+                    column[key] = new
+        self.capacity = capacity
+
+    def _as_object(self, name):
+        column = self.columns[name]
+        values = self._series(column, self.capacity).to_numpy(dtype=object, na_value=None)
+        self.columns[name] = {"kind": "object", "values": values}
+
+    def append(self, chunk):
+        start, end = self.length, self.length + len(chunk)
+        if end > self.capacity:
+            self._grow(end)
+        for name, series in chunk.items():
+            kind = self._kind(series)
+            column = self.columns.get(name)
+            if column is None:
+                dtype = getattr(series.dtype, "numpy_dtype", series.dtype) if kind in ("integer", "float") else None
+                column = self.columns[name] = self._empty(kind, dtype, self.capacity)
+            elif column["kind"] != kind:
+                # A column changing kind between chunks (e.g. all missing in the first) falls back to objects
+                if column["kind"] != "object":
+                    self._as_object(name)
+                column, kind = self.columns[name], "object"
+
+            if kind == "category":
+                new_categories = series.cat.categories.astype("object")
+                categories = column["categories"].append(new_categories[~new_categories.isin(column["categories"])])
+                codes_dtype = self._codes_dtype(len(categories))
+                if column["values"].dtype != codes_dtype:
+                    column["values"] = column["values"].astype(codes_dtype)
+                column["categories"] = categories
+                # Index -1 (missing) maps to the appended -1
+                recode = np.append(categories.get_indexer(new_categories), -1)
+                column["values"][start:end] = recode[series.cat.codes.to_numpy()]
+            elif kind == "integer":
+                dtype = np.result_type(column["values"].dtype, getattr(series.dtype, "numpy_dtype", series.dtype))
+                if column["values"].dtype != dtype:
+                    column["values"] = column["values"].astype(dtype)
+                column["values"][start:end] = series.to_numpy(dtype=dtype, na_value=0)
+                column["mask"][start:end] = series.isna().to_numpy()
+            elif kind == "float":
+                dtype = np.result_type(column["values"].dtype, series.dtype)
+                if column["values"].dtype != dtype:
+                    column["values"] = column["values"].astype(dtype)
+                column["values"][start:end] = series.to_numpy(dtype=dtype)
+            else:
+                column["values"][start:end] = series.to_numpy(dtype=object, na_value=None)
+        self.length = end
+
+    @staticmethod
+    def _series(column, length):
+        values = column["values"][:length]
+        if column["kind"] == "category":
+            dtype = pd.CategoricalDtype(column["categories"])
+            return pd.Series(pd.Categorical.from_codes(values, dtype=dtype, validate=False), copy=False)
+        if column["kind"] == "integer":
+            mask = column["mask"][:length]
+            if mask.any():
+                return pd.Series(pd.arrays.IntegerArray(values, mask), copy=False)
+            return pd.Series(values, copy=False)
+        return pd.Series(values, dtype=values.dtype, copy=False)
+
+    def frame(self):
+        """The rows appended so far, sharing the buffers' memory."""
+        return pd.DataFrame({name: self._series(column, self.length) for name, column in self.columns.items()},
+                            copy=False)
@@ -0,0 +1,270 @@
+"""On-disk index of per-run aggregates used by the Run Comparison tab.
+
+For every report under ``results/`` the index keeps the duration count, sum, sum
+of squares, min, max, error count and latency sketches of the duration and of
+every operation time, both for the whole run and for each value of the
+``INDEX_DIMENSIONS`` columns. Trend charts and percentiles over many historical
+runs are drawn from these aggregates without loading raw metrics; sketches of
+several runs or categories are merged rather than recomputed.
+
+The index lives in ``results/run_index.json``. A run is (re)summarized when its
+report directory is new or its results file changed since it was indexed.
+Run ``python run_index.py`` to bring the index up to date.
+"""
+import argparse
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from benchmark_data import (
+    atomic_write,
+    get_report_dirs,
+    operation_times_frame,
+    path_lock,
+    read_metrics,
+    report_is_complete,
+    report_signature,
+)
+from latency_sketch import LatencySketch
+
+RUN_INDEX_FILE = "run_index.json"
+# Bump when the layout of the index entries changes so runs are summarized again
+RUN_INDEX_VERSION = 2
+
+# Columns whose values get their own aggregates per run
+INDEX_DIMENSIONS = ["complexity", "language", "scenario_type", "category"]
+
+# Percentiles reported from the latency sketches
+PERCENTILES = [50, 90, 95, 99]
+# Metric name of the total duration in percentile tables (the others are operations)
+DURATION_METRIC = "duration"
+
+
+def run_timestamp(run_id):
+    """Date of a run, taken from its ``report_YYYYMMDD_HHMMSS`` directory name."""
+    return datetime.strptime(run_id.split("_")[1], "%Y%m%d")
+
+
+def _sketch(values):
+    sketch = LatencySketch()
+    sketch.add_many(values)
+    return sketch
+
+
+def summarize_durations(df):
+    """Aggregate the durations, operation times and errors of a group of test cases."""
+    durations = df["duration"].astype("float64")
+    sketch = _sketch(durations.to_numpy())
+    return {
+        "count": int(durations.count()),
+        "sum": float(durations.sum()),
+        "sum_sq": float((durations ** 2).sum()),
+        "min": float(durations.min()) if durations.count() else None,
+        "max": float(durations.max()) if durations.count() else None,
+        "errors": int(df["error_type"].notna().sum()),
+        "rows": len(df),
+        "sketch": sketch.to_dict(),
+        "operations": {
+            operation: _sketch(times.to_numpy()).to_dict()
+            for operation, times in operation_times_frame(df).items()
+            if times.notna().any()
+        },
+    }
+
+
+def summarize_run(df):
+    """Aggregate a run's metrics overall and per value of each index dimension."""
+    by_dimension = {}
+    for dimension in INDEX_DIMENSIONS:
+        if dimension not in df.columns:
+            continue
+        by_dimension[dimension] = {
+            str(value): summarize_durations(group)
+            for value, group in df.groupby(dimension, observed=True)
+        }
+    return {"overall": summarize_durations(df), "by": by_dimension}
+
+
+def load_index(path, version):
+    """Read an index of runs, or an empty one if it is missing or not of ``version``."""
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {"version": version, "runs": {}}
+    if index.get("version") != version:
+        return {"version": version, "runs": {}}
+    return index
+
+
+def save_index(index, path):
+    """Write an index of runs atomically."""
+    with atomic_write(path, "w") as f:
+        json.dump(index, f)
+
+
+def sync_index(path, version, index_run, report_dirs=(), removed=(), prune=False):
+    """Bring the entries of ``report_dirs`` in an index of runs up to date and return the index.
+
+    Reports are (re)indexed with ``index_run`` when they are new or their
+    results file changed since they were indexed. The ``removed`` runs are
+    dropped, and with ``prune`` every run not in ``report_dirs``. The file is
+    only rewritten when something changed; concurrent updates from threads of
+    one process take turns. Shared by the run index and the case index.
+    """
+    with path_lock(path):
+        index = load_index(path, version)
+        names = {Path(d).name for d in report_dirs}
+        removed = set(removed) | ({run_id for run_id in index["runs"] if run_id not in names} if prune else set())
+        changed = False
+        for run_id in sorted(removed):
+            changed |= index["runs"].pop(run_id, None) is not None
+        for report_dir in report_dirs:
+            entry = index["runs"].get(Path(report_dir).name)
+            if entry is None or entry["signature"] != list(report_signature(report_dir)[1:]):
+                index_run(index, report_dir)
+                changed = True
+        if changed:
+            save_index(index, path)
+    return index
+
+
+def complete_report_dirs(results_dir="results"):
+    """Report directories whose runs have finished; runs in progress are indexed once complete."""
+    return [d for d in get_report_dirs(results_dir) if report_is_complete(d)]
+
+
+def load_run_index(results_dir="results"):
+    """Read the run index, or an empty index if it is missing or outdated."""
+    return load_index(Path(results_dir) / RUN_INDEX_FILE, RUN_INDEX_VERSION)
+
+
+def save_run_index(index, results_dir="results"):
+    """Write the run index atomically."""
+    save_index(index, Path(results_dir) / RUN_INDEX_FILE)
+
+
+def index_run(index, report_dir, df=None):
+    """Add or refresh the entry of one report in the index (in memory)."""
+    report_dir = Path(report_dir)
+    if df is None:
+        df = read_metrics(report_dir, with_text=False)
+    _, mtime_ns, size = report_signature(report_dir)
+    index["runs"][report_dir.name] = {
+        "signature": [mtime_ns, size],
+        "timestamp": run_timestamp(report_dir.name).isoformat(),
+        **summarize_run(df),
+    }
+
+
+def update_run_index(results_dir="results"):
+    """Index new or changed complete reports, drop removed ones, and return the index."""
+    return sync_index(Path(results_dir) / RUN_INDEX_FILE, RUN_INDEX_VERSION, index_run,
+                      complete_report_dirs(results_dir), prune=True)
+
+
+def _stats_row(aggregate):
+    count = aggregate["count"]
+    mean = aggregate["sum"] / count if count else math.nan
+    if count > 1:
+        # Sample variance from the running sums, clipped against rounding error
+        variance = max((aggregate["sum_sq"] - count * mean ** 2) / (count - 1), 0.0)
+        std = math.sqrt(variance)
+    else:
+        std = math.nan
+    sketch = LatencySketch.from_dict(aggregate["sketch"])
+    return {
+        "count": count,
+        "mean": mean,
+        "std": std,
+        "min": aggregate["min"],
+        "max": aggregate["max"],
+        **{f"p{p}": sketch.quantile(p / 100) for p in PERCENTILES},
+        "error_rate": aggregate["errors"] / aggregate["rows"] if aggregate["rows"] else math.nan,
+    }
+
+
+STATS_COLUMNS = ["count", "mean", "std", "min", "max", *(f"p{p}" for p in PERCENTILES), "error_rate"]
+
+
+def run_stats_frame(index, run_ids):
+    """Per-run duration and error statistics of the given runs, oldest first."""
+    rows = [
+        {
+            "run_id": run_id,
+            "timestamp": pd.Timestamp(index["runs"][run_id]["timestamp"]),
+            **_stats_row(index["runs"][run_id]["overall"]),
+        }
+        for run_id in run_ids
+        if run_id in index["runs"]
+    ]
+    return pd.DataFrame(rows, columns=["run_id", "timestamp", *STATS_COLUMNS]
+                        ).sort_values("timestamp", kind="stable", ignore_index=True)
+
+
+def category_stats_frame(index, run_ids, dimension):
+    """Per-run statistics for each value of ``dimension``, oldest run first."""
+    rows = [
+        {
+            "run_id": run_id,
+            "timestamp": pd.Timestamp(index["runs"][run_id]["timestamp"]),
+            dimension: value,
+            **_stats_row(aggregate),
+        }
+        for run_id in run_ids
+        if run_id in index["runs"]
+        for value, aggregate in index["runs"][run_id]["by"].get(dimension, {}).items()
+    ]
+    columns = ["run_id", "timestamp", dimension, *STATS_COLUMNS]
+    return pd.DataFrame(rows, columns=columns).sort_values(["timestamp", dimension], kind="stable", ignore_index=True)
+
+
+def percentile_frame(index, run_ids, dimension=None, merge_runs=False):
+    """Percentiles of the duration and of every operation time, from the merged sketches.
+
+    Gives one row per run and metric, or per run, value of ``dimension`` and
+    metric when a dimension is given. With ``merge_runs`` the runs are combined
+    into a single ``"all"`` run first. The duration is the metric named
+    ``DURATION_METRIC``; the other metrics are operations.
+    """
+    groups = {}
+    for run_id in run_ids:
+        entry = index["runs"].get(run_id)
+        if entry is None:
+            continue
+        run_key = "all" if merge_runs else run_id
+        if dimension is None:
+            groups.setdefault((run_key,), []).append(entry["overall"])
+        else:
+            for value, aggregate in entry["by"].get(dimension, {}).items():
+                groups.setdefault((run_key, value), []).append(aggregate)
+
+    rows = []
+    for key, aggregates in groups.items():
+        sketches = {DURATION_METRIC: [a["sketch"] for a in aggregates]}
+        for aggregate in aggregates:
+            for operation, sketch in aggregate["operations"].items():
+                sketches.setdefault(operation, []).append(sketch)
+        for metric, metric_sketches in sketches.items():
+            sketch = LatencySketch.merged(LatencySketch.from_dict(d) for d in metric_sketches)
+            rows.append((*key, metric, sketch.count,
+                         *(sketch.quantile(p / 100) for p in PERCENTILES)))
+    key_columns = ["run_id"] if dimension is None else ["run_id", dimension]
+    columns = [*key_columns, "metric", "count", *(f"p{p}" for p in PERCENTILES)]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the run index of a results directory.")
+    parser.add_argument("results_dir", nargs="?", default="results", type=Path)
+    args = parser.parse_args()
+
+    index = update_run_index(args.results_dir)
+    print(f"{len(index['runs'])} runs indexed in {args.results_dir / RUN_INDEX_FILE}")
+
+
+if __name__ == "__main__":
+    main()
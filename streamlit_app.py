@@ -7,6 +7,46 @@ from pathlib import Path
 import numpy as np
 from datetime import datetime
 import seaborn as sns
+import os
+
+from benchmark_data import (
+    CATEGORICAL_COLUMNS,
+    align_categoricals,
+    ensure_sidecar,
+    get_report_dirs,
+    operation_times_frame,
+    read_metrics,
+    read_text_fields,
+    report_is_complete,
+    report_signature,
+    sidecar_is_current,
+    spawn_pool,
+)
+from case_index import case_history, case_ids, cases_by_id, paired_deltas, update_case_index
+from critical_path import (
+    DEFAULT_TAIL_QUANTILE,
+    OTHER_STAGE,
+    UNATTRIBUTED,
+    case_waterfall,
+    dominant_tail_stage,
+    tail_breakdown,
+    unmapped_operations,
+)
+from figure_render import render_png_files
+from filter_index import FILTER_FACETS, FilterIndex
+from ingest_watcher import IngestWatcher
+from load_sweep import KNEE_PERCENTILE, get_sweep_files, load_sweep, sweep_frame
+from regression import compare_runs, regression_verdict
+from results_stream import RECENT_WINDOW, RunTail
+from run_index import (
+    DURATION_METRIC,
+    INDEX_DIMENSIONS,
+    PERCENTILES,
+    category_stats_frame,
+    percentile_frame,
+    run_stats_frame,
+    update_run_index,
+)
 
 # Define a custom pastel color palette that's visible on white background
 PASTEL_COLORS = [
@@ -29,12 +69,48 @@ DIVERGING_COLORS = [
     [1, '#66B2FF']       # Pastel Blue
 ]
 
-def load_benchmark_data(report_dir):
-    """Load benchmark results and metadata from a report directory."""
-    results_file = Path(report_dir) / "benchmark_results.json"
-    with open(results_file) as f:
-        data = json.load(f)
-    return data
+# Operations that make up the total query time of a test case
+QUERY_EXECUTION_OPERATIONS = [
+    "Query Execution",
+    "Query Execution 1",
+    "Query Execution 2",
+    "Query Fixing",
+]
+AI_SEARCH_QUERY_OPERATIONS = ["VannaAI SQL Generation"]
+NORMAL_FLOW_QUERY_OPERATIONS = [
+    "Initial Query Generation",
+    "Table Retrieval",
+    "Column Extraction",
+    "Query Optimization",
+]
+
+# Number of parsed reports kept in memory across reruns (least recently used evicted first)
+REPORT_CACHE_ENTRIES = 64
+# Number of computed figures and statistics kept across reruns
+RESULT_CACHE_ENTRIES = 256
+# Labels of the Detailed Results filters
+FILTER_LABELS = {
+    "complexity": "Complexity",
+    "language": "Language",
+    "scenario_type": "Scenario Type",
+    "category": "Category",
+    "error_type": "Error Type",
+    "features": "Features",
+}
+# Convert and index new reports in a background thread (set BENCHMARK_INGEST_WATCHER=0 to disable)
+INGEST_WATCHER_ENABLED = os.environ.get("BENCHMARK_INGEST_WATCHER", "1") != "0"
+# How often an open page checks whether the watcher ingested new reports
+INGEST_REFRESH_SECONDS = 10
+# How often the Live Run tab reads new results of an in-progress run
+LIVE_REFRESH_SECONDS = 5
+# Recent P50 or P95 this many times the run's is flagged as a latency blow-up
+LATENCY_ALERT_RATIO = 1.5
+# Rows per page offered by the Detailed Results table
+DETAIL_PAGE_SIZES = [25, 50, 100, 250]
+# Upper bound on worker processes converting reports for the run comparison
+MAX_LOAD_WORKERS = min(os.cpu_count() or 1, 8)
+# Below this combined results size, starting worker processes costs more than it saves
+PARALLEL_LOAD_MIN_BYTES = 32 * 1024 * 1024
 
 def load_metadata():
     """Load metadata configuration."""
@@ -46,9 +122,160 @@ def get_available_reports():
     results_dir = Path("results")
     return sorted([d for d in results_dir.iterdir() if d.is_dir()], reverse=True)
 
-def create_metrics_df(data):
-    """Convert benchmark metrics to DataFrame."""
-    return pd.DataFrame(data["metrics"])
+@st.cache_resource(show_spinner=False)
+def start_ingest_watcher():
+    """Start the results directory watcher once per server process (see ingest_watcher)."""
+    return IngestWatcher(Path("results")).start()
+
+@st.fragment(run_every=INGEST_REFRESH_SECONDS)
+def refresh_on_ingest(watcher):
+    """Rerun the page when the watcher has ingested or removed reports since it was drawn."""
+    if watcher.generation != st.session_state.setdefault("ingest_generation", watcher.generation):
+        st.session_state["ingest_generation"] = watcher.generation
+        st.rerun()
+
+@st.cache_resource(max_entries=REPORT_CACHE_ENTRIES, show_spinner=False)
+def _load_metrics_df_cached(results_file, mtime_ns, size, with_text):
+    """Load a report's metrics DataFrame (cached on path, mtime and size)."""
+    return read_metrics(Path(results_file).parent, with_text=with_text)
+
+def load_metrics_df(report_dir, with_text=False, on_progress=None):
+    """Load the metrics DataFrame of a report, reusing the loaded frame until the file changes.
+
+    Free-text columns (answer, SQL, results) are only loaded with ``with_text``.
+    ``on_progress`` is called with each chunk of parsed rows when the report still has to be
+    converted to its sidecar. The returned frame is shared between reruns and sessions and
+    must not be modified in place.
+    """
+    if on_progress is not None:
+        # Convert outside the cached function, which must not draw on the page
+        ensure_sidecar(report_dir, on_progress=on_progress)
+    return _load_metrics_df_cached(*report_signature(report_dir), with_text)
+
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES, show_spinner=False)
+def _cached_call(report_key, fn_key, params, _fn, _data):
+    return _fn(_data, *params)
+
+def cached_result(report_key, fn, data, *params):
+    """Return ``fn(data, *params)``, computed once per report key, function and parameters.
+
+    ``report_key`` must change whenever ``data`` does, e.g. the report signature.
+    """
+    return _cached_call(report_key, f"{fn.__module__}.{fn.__qualname__}", params, fn, data)
+
+@st.cache_resource(max_entries=REPORT_CACHE_ENTRIES, show_spinner=False)
+def _test_case_index_cached(report_key, _df):
+    index = {str(k): v for k, v in _df.groupby("test_case_id", sort=False).indices.items()}
+    index.update(pd.Series(np.arange(len(_df))).groupby(case_ids(_df).to_numpy(), sort=False).indices)
+    return index
+
+def test_case_index(report_key, df):
+    """Map each test case ID of a report to the row positions holding it.
+
+    Stable IDs (see case_index) are the keys; the recorded ``test_case_id`` of
+    older runs, which is not stable, can be looked up as well. IDs repeat
+    across iterations, so every ID maps to an array of positions. Built once per
+    report key and shared between reruns; it must not be modified.
+    """
+    return _test_case_index_cached(report_key, df)
+
+@st.cache_resource(max_entries=REPORT_CACHE_ENTRIES, show_spinner=False)
+def _filter_index_cached(report_key, _df):
+    return FilterIndex.from_frame(_df)
+
+def report_filter_index(report_key, df):
+    """Bitmap filter index of a report's facet columns, built once per report key."""
+    return _filter_index_cached(report_key, df)
+
+@st.cache_resource(max_entries=REPORT_CACHE_ENTRIES, show_spinner=False)
+def live_run_tail(report_dir):
+    """Follower of an in-progress run's metrics stream, shared between reruns and sessions."""
+    return RunTail(report_dir)
+
+def load_live_run(report_dir):
+    """Read the results an in-progress run appended since the last rerun.
+
+    Returns the metrics read so far, a report key that changes whenever new results
+    were read, and the run's tail with its running aggregates.
+    """
+    tail = live_run_tail(str(report_dir))
+    tail.poll()
+    return tail.frame(), (str(tail.path), "tail", tail.offset), tail
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_run_panel(report_dir):
+    """Live view of an in-progress run, refreshed on its own every LIVE_REFRESH_SECONDS.
+
+    Each refresh reads only the results appended since the last one; all figures
+    come from the tail's running aggregates.
+    """
+    tail = live_run_tail(str(report_dir))
+    new_results = tail.poll()
+    stats = tail.stats()
+    if tail.complete:
+        st.success(f"Run complete: {stats['count']} results.")
+    else:
+        last_read = datetime.fromtimestamp(tail.updated_at).strftime("%H:%M:%S") if tail.updated_at else "never"
+        st.caption(f"Refreshing every {LIVE_REFRESH_SECONDS}s; last new results read at {last_read}.")
+    if not stats["count"]:
+        st.info("No results written yet.")
+        return
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Results", stats["count"], delta=new_results or None)
+    with col2:
+        st.metric("Error Rate", f"{stats['error_rate'] * 100:.1f}%")
+    with col3:
+        st.metric("Mean Duration (s)", f"{stats['mean']:.2f}")
+    with col4:
+        st.metric("P95 Duration (s)", f"{stats['p95']:.2f}")
+    with col5:
+        st.metric(f"P95 of Last {RECENT_WINDOW} (s)", f"{stats['recent_p95']:.2f}",
+                  delta=f"{stats['recent_p95'] - stats['p95']:+.2f}", delta_color="inverse")
+
+    # Flag a blow-up once there are enough results for the run's percentiles to be a baseline
+    if stats["count"] >= 2 * RECENT_WINDOW:
+        for p in (50, 95):
+            recent, overall = stats[f"recent_p{p}"], stats[f"p{p}"]
+            if recent > LATENCY_ALERT_RATIO * overall:
+                st.error(f"Latency blow-up: P{p} of the last {RECENT_WINDOW} results is {recent:.2f}s, "
+                         f"{recent / overall:.1f}x the run's P{p} of {overall:.2f}s.")
+                break
+
+    st.plotly_chart(plot_live_latency(pd.DataFrame(tail.history)), use_container_width=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Operation Times")
+        operations = tail.operation_stats()
+        operations.columns = ["Operation", "Count", "P50 (s)", "P95 (s)"]
+        st.dataframe(operations.round(3), hide_index=True, use_container_width=True)
+    with col2:
+        st.subheader("By Complexity")
+        complexity = tail.dimension_stats("complexity")
+        complexity["error_rate"] *= 100
+        complexity.columns = ["Complexity", "Count", "Error Rate (%)", "Mean Duration (s)"]
+        st.dataframe(complexity.round(2), hide_index=True, use_container_width=True)
+
+def show_loading_progress(placeholder):
+    """Return an on_progress callback that shows running counts of a report while it loads."""
+    totals = {"count": 0, "duration": 0.0, "errors": 0}
+
+    def on_progress(chunk):
+        totals["count"] += len(chunk)
+        totals["duration"] += chunk["duration"].sum()
+        totals["errors"] += chunk["error_type"].notna().sum()
+        with placeholder.container():
+            st.info("Loading report, figures are shown once all test cases are read...")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Test Cases Loaded", f"{totals['count']:,}")
+            with col2:
+                st.metric("Avg Duration (s)", f"{totals['duration'] / totals['count']:.2f}")
+            with col3:
+                st.metric("Success Rate", f"{(1 - totals['errors'] / totals['count']) * 100:.1f}%")
+
+    return on_progress
 
 def plot_duration_distribution(df):
     """Plot distribution of query durations."""
@@ -70,8 +297,7 @@ def plot_duration_distribution(df):
 
 def plot_operation_times(df):
     """Plot average operation times."""
-    op_times = pd.json_normalize(df["operation_times"].apply(lambda x: x if isinstance(x, dict) else {}))
-    avg_times = op_times.mean()
+    avg_times = operation_times_frame(df).mean()
     
     fig = go.Figure(data=[
         go.Bar(
@@ -90,7 +316,7 @@ def plot_operation_times(df):
 
 def plot_operation_time_by_complexity(df):
     """Plot operation times by complexity."""
-    op_times = pd.json_normalize(df["operation_times"].apply(lambda x: x if isinstance(x, dict) else {}))
+    op_times = operation_times_frame(df)
     op_times["complexity"] = df["complexity"]
     
     melted = op_times.melt(id_vars=["complexity"], var_name="Operation", value_name="Duration")
@@ -106,7 +332,7 @@ def plot_operation_time_by_complexity(df):
 
 def plot_operation_time_by_language(df):
     """Plot operation times by language."""
-    op_times = pd.json_normalize(df["operation_times"].apply(lambda x: x if isinstance(x, dict) else {}))
+    op_times = operation_times_frame(df)
     op_times["language"] = df["language"]
     
     melted = op_times.melt(id_vars=["language"], var_name="Operation", value_name="Duration")
@@ -299,7 +525,7 @@ def plot_language_distribution(df):
 
 def plot_error_distribution(df):
     """Plot distribution of error types."""
-    counts = df["error_type"].value_counts(dropna=False).rename({np.nan: "Success"})
+    counts = df["error_type"].astype("object").fillna("Success").value_counts()
     fig = px.pie(
         values=counts.values,
         names=counts.index,
@@ -308,34 +534,205 @@ def plot_error_distribution(df):
     )
     return fig
 
+def convert_reports(report_dirs):
+    """Convert reports without a current sidecar in parallel worker processes."""
+    pending = [d for d in report_dirs if not sidecar_is_current(d)]
+    pending_bytes = sum(report_signature(d)[2] for d in pending)
+    if len(pending) <= 1 or MAX_LOAD_WORKERS <= 1 or pending_bytes < PARALLEL_LOAD_MIN_BYTES:
+        for report_dir in pending:
+            ensure_sidecar(report_dir)
+        return
+    with spawn_pool(min(len(pending), MAX_LOAD_WORKERS)) as pool:
+        list(pool.map(ensure_sidecar, pending))
+
+@st.cache_data(show_spinner=False)
+def load_run_index_cached(report_signatures):
+    """Bring the run index up to date (cached on the signatures of all reports)."""
+    return update_run_index()
+
+def current_run_index():
+    """The run index, up to date with every report under results/."""
+    return load_run_index_cached(tuple(report_signature(d) for d in get_report_dirs()))
+
+@st.cache_data(show_spinner=False)
+def load_case_index_cached(report_signatures):
+    """Bring the case index up to date and invert it by case (cached on the signatures of all reports)."""
+    index = update_case_index()
+    return index, cases_by_id(index)
+
+def current_case_index():
+    """The case index and its by-case lookup, up to date with every report under results/."""
+    return load_case_index_cached(tuple(report_signature(d) for d in get_report_dirs()))
+
+def percentile_table(percentiles, index_columns):
+    """Format a percentile frame (see run_index.percentile_frame) for display."""
+    labels = {
+        "run_id": "Run",
+        "metric": "Metric",
+        "count": "Samples",
+        **{f"p{p}": f"P{p} (s)" for p in PERCENTILES},
+    }
+    return percentiles.rename(columns=labels).set_index(labels.get(index_columns, index_columns))
+
+def run_regression_check(runs, dimension):
+    """Compare the timings of a (baseline, candidate) pair of report directories."""
+    baseline, candidate = runs
+    return compare_runs(load_metrics_df(baseline), load_metrics_df(candidate), dimension=dimension)
+
 def load_multiple_runs(report_dirs):
     """Load and combine data from multiple benchmark runs."""
+    # Parse the JSON of new reports concurrently, then read every run through the report cache
+    convert_reports(report_dirs)
     all_data = []
     for report_dir in report_dirs:
-        data = load_benchmark_data(report_dir)
-        df = create_metrics_df(data)
-        df["run_id"] = report_dir.name
-        df["timestamp"] = datetime.strptime(report_dir.name.split("_")[1], "%Y%m%d")
+        df = load_metrics_df(report_dir).assign(
+            run_id=report_dir.name,
+            timestamp=datetime.strptime(report_dir.name.split("_")[1], "%Y%m%d"),
+        )
         all_data.append(df)
+    all_data = align_categoricals(all_data, ["run_id", *CATEGORICAL_COLUMNS])
     return pd.concat(all_data, ignore_index=True)
 
-def plot_duration_trend(df):
-    """Plot duration trends across runs."""
-    run_stats = df.groupby("run_id").agg({
-        "duration": ["mean", "std"],
-        "timestamp": "first"
-    }).sort_values(("timestamp", "first"))
+def plot_stage_shares(breakdown):
+    """Plot each pipeline stage's share of the time of all cases and of the tail cases (see critical_path)."""
+    fig = go.Figure()
+    for column, name, color in [
+        ("share_all", "All Cases", PASTEL_COLORS[1]),
+        ("share_tail", f"Slowest {1 - DEFAULT_TAIL_QUANTILE:.0%}", PASTEL_COLORS[0]),
+    ]:
+        fig.add_trace(go.Bar(
+            x=breakdown.index,
+            y=breakdown[column] * 100,
+            name=name,
+            marker_color=color,
+            text=[f"{v:.0%}" for v in breakdown[column]],
+            textposition="auto",
+        ))
+    fig.update_layout(
+        title="Share of Total Duration by Pipeline Stage",
+        xaxis_title="Stage",
+        yaxis_title="Share of Duration (%)",
+        barmode="group",
+    )
+    return fig
+
+def plot_load_curve(steps, knee=None, percentile=KNEE_PERCENTILE):
+    """Plot latency against achieved throughput over the steps of a load sweep, marking its knee."""
+    fig = go.Figure()
+    for p, color in [(50, PASTEL_COLORS[1]), (percentile, PASTEL_COLORS[0])]:
+        fig.add_trace(go.Scatter(
+            x=steps["throughput"],
+            y=steps[f"p{p}"],
+            mode="lines+markers",
+            name=f"P{p} Latency",
+            line=dict(color=color),
+            marker=dict(color=color),
+            text=[f"Level {level:g}" for level in steps["level"]],
+        ))
+    if knee is not None:
+        knee_step = steps.iloc[knee]
+        fig.add_trace(go.Scatter(
+            x=[knee_step["throughput"]],
+            y=[knee_step[f"p{percentile}"]],
+            mode="markers",
+            name="Knee",
+            marker=dict(color="#E45756", size=14, symbol="x"),
+        ))
+    fig.update_layout(
+        title="Latency vs Throughput",
+        xaxis_title="Throughput (requests/s)",
+        yaxis_title="Latency (seconds)",
+    )
+    return fig
+
+def plot_load_curve_by_group(group_steps, group, title, percentile=KNEE_PERCENTILE):
+    """Plot one latency-vs-throughput curve per value of a sweep grouping (see load_sweep.sweep_frame)."""
+    fig = px.line(
+        group_steps,
+        x="throughput",
+        y=f"p{percentile}",
+        color=group,
+        markers=True,
+        hover_data=["level", "requests", "error_rate"],
+        title=title,
+        labels={
+            "throughput": "Throughput (requests/s)",
+            f"p{percentile}": f"P{percentile} Latency (seconds)",
+            group: group.replace("_", " ").title(),
+        },
+        color_discrete_sequence=PASTEL_COLORS,
+    )
+    return fig
+
+def plot_live_latency(history):
+    """Plot the running and recent duration percentiles of a live run against the results read."""
+    fig = go.Figure()
+    for column, name, color, dash in [
+        ("p50", "P50", PASTEL_COLORS[1], None),
+        ("p95", "P95", PASTEL_COLORS[0], None),
+        ("recent_p95", f"P95 of Last {RECENT_WINDOW}", PASTEL_COLORS[2], "dash"),
+    ]:
+        fig.add_trace(go.Scatter(
+            x=history["count"],
+            y=history[column],
+            mode="lines+markers",
+            name=name,
+            line=dict(color=color, dash=dash),
+            marker=dict(color=color),
+        ))
+    fig.update_layout(
+        title="Duration Percentiles as Results Arrive",
+        xaxis_title="Results",
+        yaxis_title="Duration (seconds)",
+    )
+    return fig
+
+def plot_case_waterfall(waterfall):
+    """Plot a test case's operations one after another in pipeline order (see critical_path.case_waterfall)."""
+    stages = list(dict.fromkeys(waterfall["stage"]))
+    colors = {stage: PASTEL_COLORS[i % len(PASTEL_COLORS)] for i, stage in enumerate(stages)}
+    colors[UNATTRIBUTED] = "#CCCCCC"
+    fig = go.Figure(go.Bar(
+        y=waterfall["operation"],
+        x=waterfall["duration"],
+        base=waterfall["start"],
+        orientation="h",
+        marker_color=[colors[stage] for stage in waterfall["stage"]],
+        text=[f"{d:.2f}s" for d in waterfall["duration"]],
+        textposition="auto",
+        customdata=waterfall[["stage", "start", "end"]],
+        hovertemplate="%{y} (%{customdata[0]})<br>%{customdata[1]:.2f}s → %{customdata[2]:.2f}s<extra></extra>",
+    ))
+    fig.update_layout(
+        title="Critical Path",
+        xaxis_title="Time Since Start (seconds)",
+        yaxis=dict(autorange="reversed"),
+        showlegend=False,
+    )
+    return fig
 
+def plot_duration_trend(run_stats):
+    """Plot duration trends across runs from per-run statistics (see run_stats_frame)."""
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=run_stats[("timestamp", "first")],
-        y=run_stats[("duration", "mean")],
-        error_y=dict(type="data", array=run_stats[("duration", "std")]),
+        x=run_stats["timestamp"],
+        y=run_stats["mean"],
+        error_y=dict(type="data", array=run_stats["std"]),
         mode="lines+markers",
         name="Mean Duration",
         line=dict(color=PASTEL_COLORS[0]),
         marker=dict(color=PASTEL_COLORS[0]),
     ))
+    # Tail latency, estimated from the runs' latency sketches
+    for p, color in [(95, PASTEL_COLORS[1]), (99, PASTEL_COLORS[2])]:
+        fig.add_trace(go.Scatter(
+            x=run_stats["timestamp"],
+            y=run_stats[f"p{p}"],
+            mode="lines+markers",
+            name=f"P{p} Duration",
+            line=dict(color=color, dash="dash"),
+            marker=dict(color=color),
+        ))
     
     fig.update_layout(
         title="Duration Trend Across Runs",
@@ -344,17 +741,12 @@ def plot_duration_trend(df):
     )
     return fig
 
-def plot_error_rate_trend(df):
-    """Plot error rate trends across runs."""
-    run_stats = df.groupby("run_id").agg({
-        "error_type": lambda x: (~x.isna()).mean(),
-        "timestamp": "first"
-    }).sort_values("timestamp")
-
+def plot_error_rate_trend(run_stats):
+    """Plot error rate trends across runs from per-run statistics (see run_stats_frame)."""
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=run_stats["timestamp"],
-        y=run_stats["error_type"] * 100,
+        y=run_stats["error_rate"] * 100,
         mode="lines+markers",
         name="Error Rate",
         line=dict(color=PASTEL_COLORS[0]),
@@ -370,7 +762,7 @@ def plot_error_rate_trend(df):
 
 def plot_operation_time_comparison(df):
     """Plot operation time comparison across runs."""
-    op_times = pd.json_normalize(df["operation_times"].apply(lambda x: x if isinstance(x, dict) else {}))
+    op_times = operation_times_frame(df)
     op_times["run_id"] = df["run_id"]
     
     melted = op_times.melt(id_vars=["run_id"], var_name="Operation", value_name="Duration")
@@ -384,39 +776,31 @@ def plot_operation_time_comparison(df):
     )
     return fig
 
-def plot_success_rate_by_category(df, category_col):
-    """Plot success rate comparison by category across runs."""
-    success_rates = df.groupby(["run_id", category_col])["error_type"].apply(
-        lambda x: (~x.isna()).mean() * 100
-    ).reset_index()
+def plot_runs_operation_time_comparison(report_dirs):
+    """Load the given runs and plot their operation time comparison."""
+    return plot_operation_time_comparison(load_multiple_runs(report_dirs))
+
+def plot_success_rate_by_category(category_stats, category_col):
+    """Plot success rate comparison by category across runs from per-category statistics."""
+    success_rates = category_stats.assign(success_rate=(1 - category_stats["error_rate"]) * 100)
     
     fig = px.line(
         success_rates,
         x="run_id",
-        y="error_type",
+        y="success_rate",
         color=category_col,
         title=f"Success Rate by {category_col} Across Runs",
-        labels={"error_type": "Success Rate (%)"},
+        labels={"success_rate": "Success Rate (%)"},
         color_discrete_sequence=PASTEL_COLORS,
     )
     return fig
 
-def plot_performance_comparison_heatmap(df, metric="duration"):
-    """Plot performance comparison heatmap across runs and categories."""
+def plot_performance_comparison_heatmap(complexity_stats, metric="duration"):
+    """Plot performance comparison heatmap across runs from per-complexity statistics."""
     if metric == "duration":
-        pivot_data = df.pivot_table(
-            values="duration",
-            index="complexity",
-            columns="run_id",
-            aggfunc="mean"
-        )
+        pivot_data = complexity_stats.pivot(index="complexity", columns="run_id", values="mean")
     else:  # error rate
-        pivot_data = df.pivot_table(
-            values="error_type",
-            index="complexity",
-            columns="run_id",
-            aggfunc=lambda x: (~x.isna()).mean() * 100
-        )
+        pivot_data = complexity_stats.pivot(index="complexity", columns="run_id", values="error_rate") * 100
     
     fig = px.imshow(
         pivot_data,
@@ -431,13 +815,16 @@ def plot_performance_comparison_heatmap(df, metric="duration"):
     )
     return fig
 
+def ai_search_mode(df):
+    """Label each test case "AI Search" or "Normal Flow" by its ai_search_pattern."""
+    pattern = df["ai_search_pattern"]
+    return np.where(pattern.notna() & (pattern != ""), "AI Search", "Normal Flow")
+
 def plot_ai_search_duration_by_complexity(df):
     """Plot duration comparison between AI Search and Normal Flow by complexity."""
     # Add ai_search flag
     df = df.copy()
-    df["ai_search"] = df["ai_search_pattern"].apply(
-        lambda x: "AI Search" if x and not pd.isna(x) else "Normal Flow"
-    )
+    df["ai_search"] = ai_search_mode(df)
     
     fig = px.box(
         df,
@@ -458,9 +845,7 @@ def plot_ai_search_error_rates(df):
     """Plot error rate comparison between AI Search and Normal Flow."""
     # Add ai_search flag
     df = df.copy()
-    df["ai_search"] = df["ai_search_pattern"].apply(
-        lambda x: "AI Search" if x and not pd.isna(x) else "Normal Flow"
-    )
+    df["ai_search"] = ai_search_mode(df)
     
     # Calculate error rates
     error_rates = df.groupby(["ai_search", "complexity"])["error_type"].apply(
@@ -516,47 +901,31 @@ def plot_ai_search_error_rates(df):
 
 def calculate_query_times(df):
     """Calculate total query times for AI Search and Normal Flow."""
-    query_times = []
-    for _, row in df.iterrows():
-        operation_times = row.get("operation_times", {})
-        if not operation_times:
-            continue
-
-        # Calculate total query time
-        exec_times = sum(
-            float(operation_times.get(op, 0))
-            for op in [
-                "Query Execution",
-                "Query Execution 1",
-                "Query Execution 2",
-                "Query Fixing",
-            ]
-        )
+    op_times = operation_times_frame(df)
+    # Test cases without any recorded operation are left out
+    has_times = op_times.notna().to_numpy().any(axis=1)
 
-        if row["ai_search_pattern"]:
-            # AI Search: VannaAI SQL Generation + Query Executions
-            total_time = exec_times + float(
-                operation_times.get("VannaAI SQL Generation", 0)
-            )
-            mode = "AI Search"
-        else:
-            # Normal Flow: Initial Query Generation + Query Executions
-            total_time = (
-                exec_times
-                + float(operation_times.get("Initial Query Generation", 0))
-                + float(operation_times.get("Table Retrieval", 0))
-                + float(operation_times.get("Column Extraction", 0))
-                + float(operation_times.get("Query Optimization", 0))
-            )
-            mode = "Normal Flow"
+    def total(operations):
+        # Operations that did not run count as zero
+        columns = [op for op in operations if op in op_times.columns]
+        return np.nansum(op_times[columns].to_numpy(dtype="float64"), axis=1)
 
-        query_times.append({
-            "Mode": mode,
-            "Complexity": row["complexity"],
-            "Total Query Time": total_time,
-        })
-    
-    return pd.DataFrame(query_times)
+    is_ai_search = (df["ai_search_pattern"].notna() & (df["ai_search_pattern"] != "")).to_numpy()
+    # AI Search: VannaAI SQL Generation + Query Executions
+    # Normal Flow: Initial Query Generation + Query Executions
+    total_time = total(QUERY_EXECUTION_OPERATIONS) + np.where(
+        is_ai_search,
+        total(AI_SEARCH_QUERY_OPERATIONS),
+        total(NORMAL_FLOW_QUERY_OPERATIONS),
+    )
+    return pd.DataFrame({
+        "Mode": pd.Categorical.from_codes(
+            is_ai_search[has_times].astype("int8"),
+            categories=["Normal Flow", "AI Search"],
+        ),
+        "Complexity": df["complexity"][has_times].reset_index(drop=True),
+        "Total Query Time": total_time[has_times],
+    })
 
 def plot_query_time_comparison(df):
     """Plot query time comparison between AI Search and Normal Flow."""
@@ -579,9 +948,7 @@ def generate_ai_search_stats(df):
     """Generate statistical analysis for AI Search vs Normal Flow."""
     # Add ai_search flag
     df = df.copy()
-    df["ai_search"] = df["ai_search_pattern"].apply(
-        lambda x: "AI Search" if x and not pd.isna(x) else "Normal Flow"
-    )
+    df["ai_search"] = ai_search_mode(df)
     
     # Overall statistics
     overall_stats = df.groupby("ai_search").agg({
@@ -599,7 +966,7 @@ def generate_ai_search_stats(df):
     
     # Query time statistics
     query_time_df = calculate_query_times(df)
-    query_time_stats = query_time_df.groupby(["Mode", "Complexity"])["Total Query Time"].agg([
+    query_time_stats = query_time_df.groupby(["Mode", "Complexity"], observed=True)["Total Query Time"].agg([
         "mean", "std", "min", "max"
     ]).round(3)
     
@@ -624,8 +991,60 @@ def generate_ai_search_stats(df):
     
     return overall_stats, query_time_stats, findings
 
-def export_to_pdf(df, selected_report):
-    """Export all visualizations and statistics to PDF."""
+def style_for_pdf(fig):
+    """Style a plotly figure for print."""
+    # Update figure template for better colors
+    fig.update_layout(
+        template="plotly",  # Use the default plotly template for better colors
+        paper_bgcolor='rgba(0,0,0,0)',  # Transparent background
+        plot_bgcolor='rgba(0,0,0,0)',   # Transparent plot area
+        colorway=PASTEL_COLORS,  # Use a colorful palette
+    )
+    return fig
+
+def pdf_figure_sections(df):
+    """The export's figures, styled for print: ``(section title, [(plot title, figure), ...])`` in order."""
+    sections = [
+        ("Performance Analysis", [
+            ("Duration Distribution", plot_duration_distribution(df)),
+            ("Operation Times", plot_operation_times(df)),
+            ("Operation Times by Complexity", plot_operation_time_by_complexity(df)),
+            ("Operation Times by Language", plot_operation_time_by_language(df))
+        ]),
+        ("AI Search Analysis", [
+            ("Duration Analysis", plot_ai_search_duration_by_complexity(df)),
+            ("Error Rate Analysis", plot_ai_search_error_rates(df)),
+            ("Query Time Analysis", plot_query_time_comparison(df)),
+            ("AI Search Patterns", plot_ai_search_analysis(df))
+        ]),
+        ("Error Analysis", [
+            ("Error Distribution", plot_error_distribution(df)),
+            ("Retry Analysis", plot_retry_analysis(df)),
+            ("Error by Complexity", plot_error_heatmap(df, "complexity", "error_type")),
+            ("Error by Language", plot_error_heatmap(df, "language", "error_type"))
+        ]),
+        ("Context Analysis", [
+            ("Context Depth Performance", plot_performance_by_context_depth(df)),
+            ("Context vs Complexity", plot_error_heatmap(df, "complexity", "chat_context_depth")),
+            ("Context vs Language", plot_error_heatmap(df, "language", "chat_context_depth"))
+        ]),
+        ("Distribution Analysis", [
+            ("Complexity Distribution", plot_complexity_distribution(df)),
+            ("Language Distribution", plot_language_distribution(df)),
+            ("Error Type Distribution", plot_error_distribution(df))
+        ])
+    ]
+    return [(title, [(plot_title, style_for_pdf(fig)) for plot_title, fig in plots]) for title, plots in sections]
+
+def export_to_pdf(df, selected_report, render_workers=None, output_path=None):
+    """Export all visualizations and statistics to PDF.
+
+    Figures are rasterized on up to ``render_workers`` processes (see figure_render).
+    With ``output_path`` (a path or a binary file) the PDF is written there and
+    ``output_path`` returned, otherwise the PDF bytes are returned. Images are
+    read from their files while the document is drawn, never all held in memory
+    together.
+    """
     import matplotlib.pyplot as plt
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import letter, landscape
@@ -634,13 +1053,16 @@ def export_to_pdf(df, selected_report):
     from reportlab.lib.units import inch
     from reportlab.lib.enums import TA_LEFT, TA_CENTER
     import io
+    import tempfile
     import markdown2
     from pathlib import Path
     import re
     
-    # Create PDF in memory
-    pdf_buffer = io.BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=landscape(letter))
+    # Write the PDF straight to disk when a path is given, in memory otherwise
+    pdf_buffer = io.BytesIO() if output_path is None else None
+    if pdf_buffer is None and not hasattr(output_path, "write"):
+        output_path = str(output_path)
+    doc = SimpleDocTemplate(pdf_buffer or output_path, pagesize=landscape(letter))
     styles = getSampleStyleSheet()
     story = []
     
@@ -794,51 +1216,20 @@ def export_to_pdf(df, selected_report):
     story.append(overview_table)
     story.append(Spacer(1, 20))
     
-    # Function to save plotly figure as image with better quality
-    def fig_to_img(fig, width=1000, height=500):
-        # Update figure template for better colors
-        fig.update_layout(
-            template="plotly",  # Use the default plotly template for better colors
-            paper_bgcolor='rgba(0,0,0,0)',  # Transparent background
-            plot_bgcolor='rgba(0,0,0,0)',   # Transparent plot area
-            colorway=PASTEL_COLORS,  # Use a colorful palette
-        )
-        img_bytes = fig.to_image(format="png", width=width, height=height, scale=2)
-        img_io = io.BytesIO(img_bytes)
-        return Image(img_io, width=9*inch, height=4.5*inch)
-    
-    # Add all visualizations with sections
-    sections = [
-        ("Performance Analysis", [
-            ("Duration Distribution", plot_duration_distribution(df)),
-            ("Operation Times", plot_operation_times(df)),
-            ("Operation Times by Complexity", plot_operation_time_by_complexity(df)),
-            ("Operation Times by Language", plot_operation_time_by_language(df))
-        ]),
-        ("AI Search Analysis", [
-            ("Duration Analysis", plot_ai_search_duration_by_complexity(df)),
-            ("Error Rate Analysis", plot_ai_search_error_rates(df)),
-            ("Query Time Analysis", plot_query_time_comparison(df)),
-            ("AI Search Patterns", plot_ai_search_analysis(df))
-        ]),
-        ("Error Analysis", [
-            ("Error Distribution", plot_error_distribution(df)),
-            ("Retry Analysis", plot_retry_analysis(df)),
-            ("Error by Complexity", plot_error_heatmap(df, "complexity", "error_type")),
-            ("Error by Language", plot_error_heatmap(df, "language", "error_type"))
-        ]),
-        ("Context Analysis", [
-            ("Context Depth Performance", plot_performance_by_context_depth(df)),
-            ("Context vs Complexity", plot_error_heatmap(df, "complexity", "chat_context_depth")),
-            ("Context vs Language", plot_error_heatmap(df, "language", "chat_context_depth"))
-        ]),
-        ("Distribution Analysis", [
-            ("Complexity Distribution", plot_complexity_distribution(df)),
-            ("Language Distribution", plot_language_distribution(df)),
-            ("Error Type Distribution", plot_error_distribution(df))
-        ])
-    ]
-    
+    sections = pdf_figure_sections(df)
+
+    # Rasterize all figures in parallel into PNG files of this export, then lay them out in section order
+    figs = [fig for _, plots in sections for _, fig in plots]
+    image_dir = tempfile.TemporaryDirectory(prefix="benchmark_figures_")
+    try:
+        image_files = render_png_files(figs, image_dir.name, width=1000, height=500, scale=2,
+                                       max_workers=render_workers)
+    except OSError:
+        # Image cache not writable: use a cache that lives for this export only
+        image_files = render_png_files(figs, image_dir.name, width=1000, height=500, scale=2,
+                                       max_workers=render_workers, cache_dir=Path(image_dir.name) / "cache")
+    images = iter(image_files)
+
     for section_title, plots in sections:
         # Add section header with color
         section_style = ParagraphStyle(
@@ -851,7 +1242,7 @@ def export_to_pdf(df, selected_report):
         story.append(Paragraph(section_title, section_style))
         story.append(Spacer(1, 10))
         
-        for plot_title, fig in plots:
+        for plot_title, _ in plots:
             # Add plot title with color
             plot_style = ParagraphStyle(
                 'PlotTitle',
@@ -861,20 +1252,67 @@ def export_to_pdf(df, selected_report):
                 spaceAfter=5
             )
             story.append(Paragraph(plot_title, plot_style))
-            story.append(fig_to_img(fig))
+            story.append(Image(str(next(images)), width=9*inch, height=4.5*inch))
             story.append(Spacer(1, 10))
         
         story.append(PageBreak())
 
     # Build PDF
-    doc.build(story)
-    
+    try:
+        doc.build(story)
+    finally:
+        image_dir.cleanup()
+    if pdf_buffer is None:
+        return output_path
+
     # Get the PDF content
     pdf_content = pdf_buffer.getvalue()
     pdf_buffer.close()
     
     return pdf_content
 
+@st.cache_resource(show_spinner=False)
+def pdf_export_dir():
+    """Directory holding the sessions' exported PDFs, removed when the server exits."""
+    import atexit
+    import shutil
+    import tempfile
+
+    path = tempfile.mkdtemp(prefix="benchmark_exports_")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+def export_pdf_to_temp(df, selected_report):
+    """Export a report to a temporary PDF file kept for this session.
+
+    The file replaces the session's previous export, which is deleted; files
+    left over when the server exits go with ``pdf_export_dir``.
+    """
+    import tempfile
+
+    fd, pdf_file = tempfile.mkstemp(prefix=f"benchmark_report_{selected_report.name}_", suffix=".pdf",
+                                    dir=pdf_export_dir())
+    os.close(fd)
+    try:
+        export_to_pdf(df, selected_report, output_path=pdf_file)
+    except Exception:
+        os.unlink(pdf_file)
+        raise
+    previous = st.session_state.get("pdf_export")
+    st.session_state["pdf_export"] = (selected_report.name, pdf_file)
+    if previous is not None:
+        Path(previous[1]).unlink(missing_ok=True)
+    return Path(pdf_file)
+
+
+def exported_pdf(selected_report):
+    """Path of this session's exported PDF of ``selected_report``, or None."""
+    export = st.session_state.get("pdf_export")
+    if export is None or export[0] != selected_report.name or not os.path.exists(export[1]):
+        return None
+    return Path(export[1])
+
+
 def main():
     st.set_page_config(page_title="Benchmark Results Viewer", layout="wide")
     st.title("Benchmark Results Viewer")
@@ -882,6 +1320,15 @@ def main():
     # Sidebar - Report Selection
     st.sidebar.header("Report Selection")
     reports = get_available_reports()
+    if INGEST_WATCHER_ENABLED:
+        # Reports still being written are hidden until the watcher has ingested them
+        watcher = start_ingest_watcher()
+        pending = watcher.pending
+        reports = [r for r in reports if r.name not in pending]
+        if pending:
+            st.sidebar.caption(f"Ingesting {len(pending)} new report(s)...")
+        with st.sidebar:
+            refresh_on_ingest(watcher)
     
     # Single run selection
     selected_report = st.sidebar.selectbox(
@@ -894,10 +1341,6 @@ def main():
         st.warning("No benchmark reports found.")
         return
 
-    # Load data for single run analysis
-    data = load_benchmark_data(selected_report)
-    df = create_metrics_df(data)
-
     # Multiple runs selection for comparison
     st.sidebar.header("Run Comparison")
     selected_runs = st.sidebar.multiselect(
@@ -906,285 +1349,581 @@ def main():
         format_func=lambda x: x.name
     )
 
-    # Export button - Moved after data loading
-    if st.sidebar.button("Export Report to PDF"):
-        with st.spinner("Generating PDF report..."):
-            pdf_content = export_to_pdf(df, selected_report)
-            
-            # Create download button
-            st.sidebar.download_button(
-                label="📥 Download PDF Report",
-                data=pdf_content,
-                file_name=f"benchmark_report_{selected_report.name}.pdf",
-                mime="application/pdf"
-            )
-            st.sidebar.success("PDF report generated successfully!")
-
-    # Create tabs for different analyses - Reordered and grouped logically
-    tab_overview, tab_performance, tab_ai_search, tab_errors, tab_context, tab_features, tab_comparison, tab_details = st.tabs([
+    # Create tabs for different analyses - Reordered and grouped logically.
+    # Only the open tab is computed; switching tabs reruns the script.
+    (tab_overview, tab_live, tab_performance, tab_load, tab_ai_search, tab_errors, tab_context, tab_features,
+     tab_comparison, tab_details) = st.tabs([
         "Overview",                  # High-level summary
+        "Live Run",                  # In-progress runs as results arrive
         "Performance Analysis",      # Core performance metrics
+        "Load Testing",              # Throughput and saturation sweeps
         "AI Search Analysis",        # AI-specific analysis
         "Error Analysis",           # Error patterns and retry analysis
         "Context Analysis",         # Context-related metrics
         "Feature Analysis",         # Feature-specific analysis
         "Run Comparison",           # Multi-run comparison
         "Detailed Results"          # Individual test case details
-    ])
+    ], key="analysis_tab", on_change="rerun")
 
+    # Load data for single run analysis (cached until the results file changes).
+    # Large reports are parsed in chunks, with running counts shown on the Overview tab.
+    # A streamed run still in progress is followed instead: each rerun only reads its new results.
     with tab_overview:
-        st.header("Report Overview")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Test Cases", len(df))
-        with col2:
-            st.metric("Avg Duration (s)", f"{df['duration'].mean():.2f}")
-        with col3:
-            st.metric("Success Rate", f"{(df['error_type'].isna().mean() * 100):.1f}%")
-        with col4:
-            st.metric("Languages", len(df["language"].unique()))
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.plotly_chart(plot_complexity_distribution(df), use_container_width=True)
-        with col2:
-            st.plotly_chart(plot_language_distribution(df), use_container_width=True)
-        with col3:
-            st.plotly_chart(plot_error_distribution(df), use_container_width=True)
+        loading_placeholder = st.empty()
+    live_tail = None
+    if report_is_complete(selected_report):
+        df = load_metrics_df(selected_report, on_progress=show_loading_progress(loading_placeholder))
+        report_key = report_signature(selected_report)
+    else:
+        df, report_key, live_tail = load_live_run(selected_report)
+        st.sidebar.caption(f"Run in progress: {live_tail.count} results so far")
+    loading_placeholder.empty()
+
+    # Export button - Moved after data loading
+    if st.sidebar.button("Export Report to PDF"):
+        with st.spinner("Generating PDF report..."):
+            export_pdf_to_temp(df, selected_report)
+            st.sidebar.success("PDF report generated successfully!")
+
+    # Download button - the PDF is read from disk only when it is downloaded
+    pdf_file = exported_pdf(selected_report)
+    if pdf_file is not None:
+        st.sidebar.download_button(
+            label="📥 Download PDF Report",
+            data=pdf_file.read_bytes,
+            file_name=f"benchmark_report_{selected_report.name}.pdf",
+            mime="application/pdf"
+        )
+
+    with tab_overview:
+        if tab_overview.open:
+            st.header("Report Overview")
+            if live_tail is not None:
+                st.info(f"This run is still in progress. Showing the {live_tail.count} results written so far; "
+                        "the Live Run tab follows it as new results arrive.")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Test Cases", len(df))
+            with col2:
+                st.metric("Avg Duration (s)", f"{df['duration'].mean():.2f}")
+            with col3:
+                st.metric("Success Rate", f"{(df['error_type'].isna().mean() * 100):.1f}%")
+            with col4:
+                st.metric("Languages", len(df["language"].unique()))
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.plotly_chart(cached_result(report_key, plot_complexity_distribution, df), use_container_width=True)
+            with col2:
+                st.plotly_chart(cached_result(report_key, plot_language_distribution, df), use_container_width=True)
+            with col3:
+                st.plotly_chart(cached_result(report_key, plot_error_distribution, df), use_container_width=True)
+
+    with tab_live:
+        if tab_live.open:
+            st.header("Live Run")
+            live_runs = [r for r in reports if not report_is_complete(r)]
+            if not live_runs:
+                st.info("No run in progress. Runs started with `python benchmark_runner.py` stream their results "
+                        "and show up here while they are going.")
+            else:
+                default = live_runs.index(selected_report) if selected_report in live_runs else 0
+                live_run = st.selectbox("Select Run in Progress", live_runs, index=default,
+                                        format_func=lambda x: x.name, key="live_run")
+                live_run_panel(live_run)
 
     with tab_performance:
-        st.header("Performance Analysis")
+        if tab_performance.open:
+            st.header("Performance Analysis")
         
-        # Duration Distribution
-        st.subheader("Query Duration Analysis")
-        st.plotly_chart(plot_duration_distribution(df), use_container_width=True)
+            # Duration Distribution
+            st.subheader("Query Duration Analysis")
+            st.plotly_chart(cached_result(report_key, plot_duration_distribution, df), use_container_width=True)
         
-        # Operation Times
-        st.subheader("Operation Time Analysis")
-        st.plotly_chart(plot_operation_times(df), use_container_width=True)
+            # Operation Times
+            st.subheader("Operation Time Analysis")
+            st.plotly_chart(cached_result(report_key, plot_operation_times, df), use_container_width=True)
         
-        # Operation Times by Complexity and Language
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(plot_operation_time_by_complexity(df), use_container_width=True)
-        with col2:
-            st.plotly_chart(plot_operation_time_by_language(df), use_container_width=True)
+            # Operation Times by Complexity and Language
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(cached_result(report_key, plot_operation_time_by_complexity, df), use_container_width=True)
+            with col2:
+                st.plotly_chart(cached_result(report_key, plot_operation_time_by_language, df), use_container_width=True)
+
+            # Where the time of the slowest cases goes, by pipeline stage
+            st.subheader("Critical Path Analysis")
+            breakdown = cached_result(report_key, tail_breakdown, df)
+            dominant_stage = dominant_tail_stage(breakdown)
+            unmapped = cached_result(report_key, unmapped_operations, df)
+            if not unmapped.empty:
+                st.warning(
+                    f"Operations without a pipeline stage are counted as {OTHER_STAGE}: "
+                    + ", ".join(f"{operation} ({share:.1%} of the time)" for operation, share in unmapped.items())
+                )
+            if dominant_stage is None:
+                st.info("No operation times recorded for this report.")
+            else:
+                st.write(
+                    f"In the slowest {1 - DEFAULT_TAIL_QUANTILE:.0%} of test cases, **{dominant_stage}** takes "
+                    f"{breakdown.loc[dominant_stage, 'share_tail']:.0%} of the time "
+                    f"({breakdown.loc[dominant_stage, 'share_all']:.0%} across all cases); "
+                    f"{breakdown.loc[UNATTRIBUTED, 'share_tail']:.0%} is not attributed to any operation."
+                )
+                st.plotly_chart(plot_stage_shares(breakdown), use_container_width=True)
+
+            # Tail latency of the duration and each operation, from the run index sketches
+            st.subheader("Latency Percentiles")
+            run_index = current_run_index()
+            group_by = st.selectbox("Group Percentiles By", ["overall", *INDEX_DIMENSIONS], key="percentile_group_by")
+            percentiles = percentile_frame(run_index, [selected_report.name], None if group_by == "overall" else group_by)
+            if percentiles.empty:
+                # Only complete runs are in the run index
+                st.info("Percentiles are available once the run has finished and been indexed; "
+                        "the Live Run tab shows operation percentiles while it is in progress.")
+            elif group_by == "overall":
+                st.dataframe(percentile_table(percentiles.drop(columns="run_id"), "metric"), use_container_width=True)
+            else:
+                metric = st.selectbox("Metric", percentiles["metric"].unique(), key="percentile_metric")
+                st.dataframe(
+                    percentile_table(percentiles[percentiles["metric"] == metric].drop(columns=["run_id", "metric"]), group_by),
+                    use_container_width=True
+                )
+
+    with tab_load:
+        if tab_load.open:
+            st.header("Load Testing")
+            sweep_files = get_sweep_files(Path("results"))
+            if not sweep_files:
+                st.info("No load sweeps yet. Run e.g. `python load_sweep.py <target-url> --qps 0.5 1 2 4` "
+                        "to sweep offered load and record the results here.")
+            else:
+                sweep_file = st.selectbox("Select Load Sweep", sweep_files, format_func=lambda x: x.stem,
+                                          key="load_sweep")
+                sweep = load_sweep(sweep_file)
+                steps = sweep_frame(sweep)
+                level_name = "Offered QPS" if sweep["mode"] == "qps" else "Concurrency"
+
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Steps", len(steps))
+                with col2:
+                    st.metric("Peak Throughput (req/s)", f"{steps['throughput'].max():.2f}")
+                if sweep["knee"] is not None:
+                    knee = steps.iloc[sweep["knee"]]
+                    with col3:
+                        st.metric(f"Knee ({level_name})", f"{knee['level']:g}")
+                    with col4:
+                        st.metric(f"P{KNEE_PERCENTILE} at Knee (s)", f"{knee[f'p{KNEE_PERCENTILE}']:.2f}")
+                    st.write(
+                        f"Up to **{knee['throughput']:.2f} requests/s** the target keeps P{KNEE_PERCENTILE} latency "
+                        f"at {knee[f'p{KNEE_PERCENTILE}']:.2f}s; beyond that, extra load mostly adds latency."
+                    )
+                else:
+                    st.caption("No knee found: latency did not turn up over the swept load levels.")
+
+                st.plotly_chart(plot_load_curve(steps, sweep["knee"]), use_container_width=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.plotly_chart(plot_load_curve_by_group(
+                        sweep_frame(sweep, "complexity"), "complexity", "Latency vs Throughput by Complexity"
+                    ), use_container_width=True)
+                with col2:
+                    st.plotly_chart(plot_load_curve_by_group(
+                        sweep_frame(sweep, "ai_search"), "ai_search", "Latency vs Throughput: AI Search vs Normal Flow"
+                    ), use_container_width=True)
+
+                st.subheader("Sweep Steps")
+                step_table = steps[["level", "requests", "throughput", "goodput", "error_rate",
+                                    *[f"p{p}" for p in PERCENTILES]]].copy()
+                step_table["error_rate"] *= 100
+                step_table.columns = [level_name, "Requests", "Throughput (req/s)", "Goodput (req/s)", "Error Rate (%)",
+                                      *[f"P{p} (s)" for p in PERCENTILES]]
+                st.dataframe(step_table.round(3), hide_index=True, use_container_width=True)
 
     with tab_ai_search:
-        st.header("AI Search vs Normal Flow Analysis")
+        if tab_ai_search.open:
+            st.header("AI Search vs Normal Flow Analysis")
         
-        # Overall Statistics
-        overall_stats, query_time_stats, findings = generate_ai_search_stats(df)
+            # Overall Statistics
+            overall_stats, query_time_stats, findings = cached_result(report_key, generate_ai_search_stats, df)
         
-        # Key Findings
-        st.subheader("Key Findings")
-        for metric, finding in findings.items():
-            st.write(f"- **{metric}:** {finding}")
+            # Key Findings
+            st.subheader("Key Findings")
+            for metric, finding in findings.items():
+                st.write(f"- **{metric}:** {finding}")
         
-        # Duration Analysis
-        st.subheader("Duration Analysis")
-        st.plotly_chart(plot_ai_search_duration_by_complexity(df), use_container_width=True)
+            # Duration Analysis
+            st.subheader("Duration Analysis")
+            st.plotly_chart(cached_result(report_key, plot_ai_search_duration_by_complexity, df), use_container_width=True)
         
-        # Error Rate Analysis
-        st.subheader("Error Rate Analysis")
-        st.plotly_chart(plot_ai_search_error_rates(df), use_container_width=True)
+            # Error Rate Analysis
+            st.subheader("Error Rate Analysis")
+            st.plotly_chart(cached_result(report_key, plot_ai_search_error_rates, df), use_container_width=True)
         
-        # Query Time Analysis
-        st.subheader("Query Time Analysis")
-        st.plotly_chart(plot_query_time_comparison(df), use_container_width=True)
+            # Query Time Analysis
+            st.subheader("Query Time Analysis")
+            st.plotly_chart(cached_result(report_key, plot_query_time_comparison, df), use_container_width=True)
         
-        # Detailed Statistics
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Overall Performance Statistics")
-            st.dataframe(overall_stats, use_container_width=True)
+            # Detailed Statistics
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Overall Performance Statistics")
+                st.dataframe(overall_stats, use_container_width=True)
         
-        with col2:
-            st.subheader("Query Time Statistics by Complexity")
-            st.dataframe(query_time_stats, use_container_width=True)
+            with col2:
+                st.subheader("Query Time Statistics by Complexity")
+                st.dataframe(query_time_stats, use_container_width=True)
 
     with tab_errors:
-        st.header("Error Analysis")
+        if tab_errors.open:
+            st.header("Error Analysis")
         
-        # Retry Analysis
-        st.subheader("Retry Performance")
-        st.plotly_chart(plot_retry_analysis(df), use_container_width=True)
+            # Retry Analysis
+            st.subheader("Retry Performance")
+            st.plotly_chart(cached_result(report_key, plot_retry_analysis, df), use_container_width=True)
         
-        # Error Correlations
-        st.subheader("Error Correlations")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(
-                plot_error_heatmap(df, "complexity", "error_type"),
-                use_container_width=True
-            )
-        with col2:
-            st.plotly_chart(
-                plot_error_heatmap(df, "language", "error_type"),
-                use_container_width=True
-            )
+            # Error Correlations
+            st.subheader("Error Correlations")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(
+                    cached_result(report_key, plot_error_heatmap, df, "complexity", "error_type"),
+                    use_container_width=True
+                )
+            with col2:
+                st.plotly_chart(
+                    cached_result(report_key, plot_error_heatmap, df, "language", "error_type"),
+                    use_container_width=True
+                )
 
     with tab_context:
-        st.header("Context Analysis")
+        if tab_context.open:
+            st.header("Context Analysis")
         
-        # Context Depth Analysis
-        st.plotly_chart(plot_performance_by_context_depth(df), use_container_width=True)
+            # Context Depth Analysis
+            st.plotly_chart(cached_result(report_key, plot_performance_by_context_depth, df), use_container_width=True)
         
-        # Error Heatmap
-        st.subheader("Error Analysis by Context")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(
-                plot_error_heatmap(df, "complexity", "chat_context_depth"),
-                use_container_width=True
-            )
-        with col2:
-            st.plotly_chart(
-                plot_error_heatmap(df, "language", "chat_context_depth"),
-                use_container_width=True
-            )
+            # Error Heatmap
+            st.subheader("Error Analysis by Context")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(
+                    cached_result(report_key, plot_error_heatmap, df, "complexity", "chat_context_depth"),
+                    use_container_width=True
+                )
+            with col2:
+                st.plotly_chart(
+                    cached_result(report_key, plot_error_heatmap, df, "language", "chat_context_depth"),
+                    use_container_width=True
+                )
 
     with tab_features:
-        st.header("Feature Analysis")
+        if tab_features.open:
+            st.header("Feature Analysis")
         
-        # Feature Performance
-        st.plotly_chart(plot_feature_analysis(df), use_container_width=True)
+            # Feature Performance
+            st.plotly_chart(cached_result(report_key, plot_feature_analysis, df), use_container_width=True)
         
-        # AI Search Patterns
-        if "ai_search_pattern" in df.columns:
-            st.plotly_chart(plot_ai_search_analysis(df), use_container_width=True)
+            # AI Search Patterns
+            if "ai_search_pattern" in df.columns:
+                st.plotly_chart(cached_result(report_key, plot_ai_search_analysis, df), use_container_width=True)
 
     with tab_comparison:
-        st.header("Run Comparison Analysis")
+        if tab_comparison.open:
+            st.header("Run Comparison Analysis")
         
-        if len(selected_runs) < 2:
-            st.warning("Please select at least 2 runs to compare in the sidebar.")
-        else:
-            # Load data for all selected runs
-            comparison_df = load_multiple_runs(selected_runs)
-            
-            # Overall Trends
-            st.subheader("Performance Trends")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.plotly_chart(plot_duration_trend(comparison_df), use_container_width=True)
-            with col2:
-                st.plotly_chart(plot_error_rate_trend(comparison_df), use_container_width=True)
-            
-            # Operation Time Comparison
-            st.subheader("Operation Time Comparison")
-            st.plotly_chart(plot_operation_time_comparison(comparison_df), use_container_width=True)
+            if len(selected_runs) < 2:
+                st.warning("Please select at least 2 runs to compare in the sidebar.")
+            else:
+                # Trends, heatmaps and stats come from the run index, without loading raw metrics
+                run_index = current_run_index()
+                run_ids = [d.name for d in selected_runs]
+                run_stats = run_stats_frame(run_index, run_ids)
             
-            # Success Rate Comparisons
-            st.subheader("Success Rate Comparisons")
-            category = st.selectbox(
-                "Select Category for Success Rate Comparison",
-                ["complexity", "language", "scenario_type"]
-            )
-            st.plotly_chart(plot_success_rate_by_category(comparison_df, category), use_container_width=True)
+                # Overall Trends
+                st.subheader("Performance Trends")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.plotly_chart(plot_duration_trend(run_stats), use_container_width=True)
+                with col2:
+                    st.plotly_chart(plot_error_rate_trend(run_stats), use_container_width=True)
             
-            # Performance Heatmaps
-            st.subheader("Performance Comparison Heatmaps")
-            col1, col2 = st.columns(2)
-            with col1:
+                # Operation Time Comparison
+                st.subheader("Operation Time Comparison")
                 st.plotly_chart(
-                    plot_performance_comparison_heatmap(comparison_df, "duration"),
+                    cached_result(
+                        tuple(report_signature(d) for d in selected_runs),
+                        plot_runs_operation_time_comparison,
+                        selected_runs,
+                    ),
                     use_container_width=True
                 )
-            with col2:
+            
+                # Success Rate Comparisons
+                st.subheader("Success Rate Comparisons")
+                category = st.selectbox(
+                    "Select Category for Success Rate Comparison",
+                    ["complexity", "language", "scenario_type"]
+                )
                 st.plotly_chart(
-                    plot_performance_comparison_heatmap(comparison_df, "error_rate"),
+                    plot_success_rate_by_category(category_stats_frame(run_index, run_ids, category), category),
                     use_container_width=True
                 )
             
-            # Statistical Analysis
-            st.subheader("Statistical Analysis")
-            run_stats = comparison_df.groupby("run_id").agg({
-                "duration": ["mean", "std", "min", "max"],
-                "error_type": lambda x: (~x.isna()).mean() * 100,
-                "timestamp": "first"
-            }).sort_values(("timestamp", "first"))
+                # Performance Heatmaps
+                st.subheader("Performance Comparison Heatmaps")
+                complexity_stats = category_stats_frame(run_index, run_ids, "complexity")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.plotly_chart(
+                        plot_performance_comparison_heatmap(complexity_stats, "duration"),
+                        use_container_width=True
+                    )
+                with col2:
+                    st.plotly_chart(
+                        plot_performance_comparison_heatmap(complexity_stats, "error_rate"),
+                        use_container_width=True
+                    )
             
-            st.dataframe(run_stats, use_container_width=True)
+                # Statistical Analysis
+                st.subheader("Statistical Analysis")
+                st.dataframe(
+                    run_stats.set_index("run_id").assign(error_rate=run_stats["error_rate"].to_numpy() * 100).rename(columns={
+                        "timestamp": "Timestamp",
+                        "count": "Test Cases",
+                        "mean": "Mean Duration",
+                        "std": "Std Duration",
+                        "min": "Min Duration",
+                        "max": "Max Duration",
+                        **{f"p{p}": f"P{p} Duration" for p in PERCENTILES},
+                        "error_rate": "Error Rate (%)",
+                    }),
+                    use_container_width=True
+                )
+
+                # Significance-tested latency changes between two of the selected runs
+                st.subheader("Regression Check")
+                runs_by_date = sorted(selected_runs, key=lambda d: d.name)
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    baseline_run = st.selectbox("Baseline Run", runs_by_date, index=len(runs_by_date) - 2,
+                                                format_func=lambda d: d.name, key="regression_baseline")
+                with col2:
+                    candidate_run = st.selectbox("Candidate Run", runs_by_date, index=len(runs_by_date) - 1,
+                                                 format_func=lambda d: d.name, key="regression_candidate")
+                with col3:
+                    regression_dimension = st.selectbox("Compare Per", INDEX_DIMENSIONS,
+                                                        index=INDEX_DIMENSIONS.index("category"), key="regression_dimension")
+                if baseline_run == candidate_run:
+                    st.info("Select two different runs to check for regressions.")
+                else:
+                    regression_results = cached_result(
+                        (report_signature(baseline_run), report_signature(candidate_run)),
+                        run_regression_check,
+                        (baseline_run, candidate_run),
+                        regression_dimension,
+                    )
+                    verdict = regression_verdict(regression_results, baseline_run.name, candidate_run.name,
+                                                 regression_dimension)
+                    if verdict["verdict"] == "regression":
+                        st.error(f"{len(verdict['regressions'])} significant regression(s) out of {verdict['tested']} tested comparisons")
+                    else:
+                        st.success(f"No significant regressions in {verdict['tested']} tested comparisons")
+                    show_all = st.checkbox("Show all comparisons", key="regression_show_all")
+                    shown = regression_results if show_all else regression_results[
+                        regression_results["verdict"].isin(["regression", "improvement"])
+                    ]
+                    st.dataframe(
+                        shown.assign(**{c: shown[c] * 100 for c in ["median_change", "mean_change_low", "mean_change_high"]}).rename(columns={
+                            "group": regression_dimension,
+                            "metric": "Metric",
+                            "baseline_n": "Baseline N",
+                            "candidate_n": "Candidate N",
+                            "pairs": "Pairs",
+                            "baseline_median": "Baseline Median (s)",
+                            "candidate_median": "Candidate Median (s)",
+                            "median_change": "Median Change (%)",
+                            "mean_change_low": "Mean Change CI Low (%)",
+                            "mean_change_high": "Mean Change CI High (%)",
+                            "p_value": "p-value",
+                            "p_adjusted": "Adjusted p-value",
+                            "verdict": "Verdict",
+                        }),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    st.download_button(
+                        "📥 Download Verdict (JSON)",
+                        data=json.dumps(verdict, indent=2),
+                        file_name=f"regression_{baseline_run.name}_vs_{candidate_run.name}.json",
+                        mime="application/json"
+                    )
+
+                    # The same test cases paired across the two runs by their stable IDs
+                    st.subheader("Per-Case Latency Deltas")
+                    case_index, _ = current_case_index()
+                    deltas = paired_deltas(case_index, baseline_run.name, candidate_run.name)
+                    if deltas.empty:
+                        st.info("The two runs have no test cases in common.")
+                    else:
+                        st.caption(f"{len(deltas)} test cases in both runs, largest slowdown first")
+                        st.dataframe(
+                            deltas.assign(change=deltas["change"] * 100).rename(columns={
+                                "case_id": "Test Case",
+                                "question": "Question",
+                                "baseline_median": "Baseline Median (s)",
+                                "candidate_median": "Candidate Median (s)",
+                                "delta": "Change (s)",
+                                "change": "Change (%)",
+                            }),
+                            hide_index=True,
+                            use_container_width=True
+                        )
+
+                # Percentiles per run and across all selected runs (merged sketches, no raw rows)
+                st.subheader("Latency Percentiles")
+                percentiles = percentile_frame(run_index, run_ids)
+                metric = st.selectbox(
+                    "Metric",
+                    [DURATION_METRIC, *sorted(m for m in percentiles["metric"].unique() if m != DURATION_METRIC)],
+                    key="comparison_percentile_metric"
+                )
+                st.dataframe(
+                    percentile_table(
+                        pd.concat([
+                            percentiles[percentiles["metric"] == metric],
+                            percentile_frame(run_index, run_ids, merge_runs=True).query("metric == @metric")
+                            .assign(run_id="All selected runs"),
+                        ]).drop(columns="metric"),
+                        "run_id"
+                    ),
+                    use_container_width=True
+                )
 
     with tab_details:
-        st.header("Detailed Results")
+        if tab_details.open:
+            st.header("Detailed Results")
         
-        # Filters
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            complexity_filter = st.multiselect(
-                "Complexity",
-                df["complexity"].unique()
-            )
-        with col2:
-            language_filter = st.multiselect(
-                "Language",
-                df["language"].unique()
-            )
-        with col3:
-            scenario_filter = st.multiselect(
-                "Scenario Type",
-                df["scenario_type"].unique()
+            # Filters, combined through the report's bitmap index (AND across facets, OR within one)
+            filter_index = report_filter_index(report_key, df)
+            selections = {}
+            facets = [facet for facet in FILTER_FACETS if facet in filter_index.facets]
+            for row_start in range(0, len(facets), 3):
+                for col, facet in zip(st.columns(3), facets[row_start:row_start + 3]):
+                    counts = filter_index.counts(facet)
+                    with col:
+                        selections[facet] = st.multiselect(
+                            FILTER_LABELS.get(facet, facet),
+                            filter_index.values(facet),
+                            format_func=lambda value, counts=counts: f"{value} ({counts[value]:,})"
+                        )
+            mask = filter_index.select(selections)
+
+            # Jump to a test case by ID through the test case index
+            case_id = st.text_input("Test Case ID", placeholder="Show only the rows of this test case ID",
+                                    help="A stable ID, or the recorded test_case_id of an older run").strip()
+            if case_id:
+                case_positions = test_case_index(report_key, df).get(case_id, np.array([], dtype=np.intp))
+                positions = case_positions[mask[case_positions]]
+            else:
+                positions = np.flatnonzero(mask)
+
+            # Only the rows of the current page are sent to the browser
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                page_size = st.selectbox("Rows per page", DETAIL_PAGE_SIZES, index=1)
+            page_count = max(1, -(-len(positions) // page_size))
+            if st.session_state.get("details_page", 1) > page_count:
+                st.session_state["details_page"] = page_count
+            with col2:
+                page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="details_page")
+            page_positions = positions[(page - 1) * page_size:page * page_size]
+            page_df = df.iloc[page_positions]
+            st.caption(
+                f"Rows {(page - 1) * page_size + min(1, len(page_positions)):,}–"
+                f"{(page - 1) * page_size + len(page_positions):,} of {len(positions):,}"
             )
 
-        # Apply filters
-        filtered_df = df.copy()
-        if complexity_filter:
-            filtered_df = filtered_df[filtered_df["complexity"].isin(complexity_filter)]
-        if language_filter:
-            filtered_df = filtered_df[filtered_df["language"].isin(language_filter)]
-        if scenario_filter:
-            filtered_df = filtered_df[filtered_df["scenario_type"].isin(scenario_filter)]
-
-        # Display filtered results
-        st.dataframe(
-            filtered_df[[
-                "test_case_id",
-                "question",
-                "complexity",
-                "language",
-                "scenario_type",
-                "duration",
-                "error_type"
-            ]],
-            use_container_width=True
-        )
+            # Display filtered results, identified by their stable IDs next to the recorded ones
+            page_case_ids = case_ids(page_df).to_numpy()
+            st.dataframe(
+                page_df.assign(case_id=page_case_ids)[[
+                    "case_id",
+                    "test_case_id",
+                    "question",
+                    "complexity",
+                    "language",
+                    "scenario_type",
+                    "duration",
+                    "error_type"
+                ]],
+                use_container_width=True
+            )
 
-        # Detailed Test Case View
-        st.header("Test Case Details")
-        selected_case = st.selectbox(
-            "Select Test Case",
-            filtered_df["test_case_id"],
-            format_func=lambda x: f"{x} - {filtered_df[filtered_df['test_case_id'] == x]['question'].iloc[0][:50]}..."
-        )
+            # Detailed Test Case View
+            st.header("Test Case Details")
+            questions = page_df["question"].to_numpy()
+            selected_row = st.selectbox(
+                "Select Test Case",
+                range(len(page_positions)),
+                format_func=lambda i: f"{page_case_ids[i]} - {str(questions[i])[:50]}..."
+            )
 
-        if selected_case:
-            case_data = filtered_df[filtered_df["test_case_id"] == selected_case].iloc[0]
+            if selected_row is not None:
+                case_position = page_positions[selected_row]
+                case_data = df.iloc[case_position]
+                # Free-text fields are read for this case only: from the report's text store,
+                # or from the case's own line of the stream while the run is in progress
+                if live_tail is not None:
+                    case_text = live_tail.text_fields([case_position]).iloc[0]
+                else:
+                    case_text = read_text_fields(selected_report, [case_position]).iloc[0]
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.subheader("Question & Answer")
-                st.write("**Question:**")
-                st.write(case_data["question"])
-                st.write("**Answer:**")
-                st.write(case_data["answer"])
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.subheader("Question & Answer")
+                    st.write("**Question:**")
+                    st.write(case_data["question"])
+                    st.write("**Answer:**")
+                    st.write(case_text["answer"])
             
-            with col2:
-                st.subheader("SQL & Results")
-                st.write("**SQL Query:**")
-                st.code(case_data["sql"], language="sql")
-                st.write("**Results:**")
-                st.write(case_data["sql_result"])
-
-            st.subheader("Performance Breakdown")
-            st.write("**Operation Times:**")
-            op_times = pd.Series(case_data["operation_times"])
-            st.bar_chart(op_times)
-
-            if case_data["error_type"]:
-                st.error(f"Error Type: {case_data['error_type']}")
-                st.error(f"Error Details: {case_data['error']}")
+                with col2:
+                    st.subheader("SQL & Results")
+                    st.write("**SQL Query:**")
+                    st.code(case_text["sql"] or "", language="sql")
+                    st.write("**Results:**")
+                    st.write(case_text["sql_result"])
+
+                st.subheader("Performance Breakdown")
+                st.write("**Operation Times:**")
+                op_times = operation_times_frame(df.iloc[[case_position]]).iloc[0].dropna()
+                st.bar_chart(op_times)
+                st.plotly_chart(plot_case_waterfall(case_waterfall(case_data)), use_container_width=True)
+
+                if pd.notna(case_data["error_type"]):
+                    st.error(f"Error Type: {case_data['error_type']}")
+                    st.error(f"Error Details: {case_text['error']}")
+
+                st.subheader("History Across Runs")
+                _, cases = current_case_index()
+                history = case_history(cases, page_case_ids[selected_row])
+                if history.empty:
+                    st.info("This test case is not in the case index yet.")
+                else:
+                    st.caption(f"Test case {page_case_ids[selected_row]} in {len(history)} run(s)")
+                    st.line_chart(history.set_index("run_id")[["median", "mean"]])
+                    st.dataframe(
+                        history.rename(columns={
+                            "run_id": "Run",
+                            "count": "Results",
+                            "errors": "Errors",
+                            "median": "Median Duration (s)",
+                            "mean": "Mean Duration (s)",
+                        }),
+                        hide_index=True,
+                        use_container_width=True
+                    )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,22 @@
+from benchmark_runner import result_record, write_results
+
+CASE = {
+    "question": "How many students posted this week?",
+    "complexity": "basic",
+    "features": "aggregation",
+    "language": "en",
+    "category": "simple_aggregations",
+    "scenario_type": "single_turn",
+}
+
+
+def record(iteration, error_type=None, case=CASE):
+    """A result of ``case`` as the runner records it."""
+    response = {"answer": "42", "error_type": error_type, "operation_times": {"Query Execution": 0.5}}
+    return result_record(case, response, 1.0 + iteration, iteration, "recorded_1234")
+
+
+def write_report(results_dir, name, count=3):
+    """Write a complete JSON report of ``count`` results and return its directory."""
+    metrics = [record(i) for i in range(count)]
+    return write_results(results_dir / name, metrics, {"total": count}).parent
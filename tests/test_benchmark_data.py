@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import benchmark_data
+from benchmark_data import (
+    SIDECAR_VERSION,
+    TEXT_COLUMNS,
+    align_categoricals,
+    atomic_write,
+    convert_report,
+    create_metrics_df,
+    ensure_sidecar,
+    iter_metrics_chunks,
+    parse_metrics,
+    read_metrics,
+    read_text_fields,
+    read_texts,
+    results_path,
+    sidecar_is_current,
+    sidecar_path,
+    text_store_path,
+    write_sidecar,
+)
+from benchmark_runner import result_record, write_results
+from helpers import CASE
+from results_stream import MetricsStreamWriter
+
+
+def varied_metrics(count=25):
+    """Runner records whose operations, errors and categories change along the run."""
+    metrics = []
+    for i in range(count):
+        case = {**CASE, "language": ["en", "vi"][i % 2], "category": f"category_{i // 10}"}
+        operations = {"Query Execution": 0.25 + i / 8}
+        if i >= 12:
+            operations["Query Fixing"] = 0.125
+        response = {"answer": f"Câu trả lời {i} \u2014 \"quoted\"", "sql": "SELECT 1" if i % 3 else None,
+                    "error_type": "SQL_ERROR" if i % 7 == 6 else None, "operation_times": operations}
+        metrics.append(result_record(case, response, 1.5 + i, i // 5, f"case_{i % 5}"))
+    return metrics
+
+
+def assert_same_metrics(actual, expected):
+    # Free-text columns are str or object depending on which chunks held a value; only their values matter
+    def plain_text(df):
+        text = df[[c for c in TEXT_COLUMNS if c in df.columns]].astype("object")
+        return df.assign(**text.where(text.notna(), None))
+
+    pd.testing.assert_frame_equal(plain_text(actual), plain_text(expected), check_like=True,
+                                  check_categorical=False)
+
+
+def test_align_categoricals_with_all_null_column():
+    no_errors = pd.DataFrame({"error_type": pd.Series([None, None], dtype="category")})
+    errors = pd.DataFrame({"error_type": pd.Series(["SQL_ERROR", None], dtype="category")})
+
+    combined = pd.concat(align_categoricals([no_errors, errors]), ignore_index=True)
+
+    assert isinstance(combined["error_type"].dtype, pd.CategoricalDtype)
+    assert list(combined["error_type"].cat.categories) == ["SQL_ERROR"]
+    assert combined["error_type"].isna().tolist() == [True, True, False, True]
+
+
+def test_align_categoricals_with_only_null_columns():
+    frames = [pd.DataFrame({"error_type": pd.Series([None], dtype="object")}) for _ in range(2)]
+
+    combined = pd.concat(align_categoricals(frames), ignore_index=True)
+
+    assert isinstance(combined["error_type"].dtype, pd.CategoricalDtype)
+    assert combined["error_type"].isna().all()
+
+
+def test_atomic_write_from_concurrent_threads(tmp_path):
+    path = tmp_path / "index.json"
+    errors = []
+
+    def write(n):
+        try:
+            for _ in range(50):
+                with atomic_write(path, "w") as f:
+                    f.write(str(n) * 1000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert path.read_text() in {str(n) * 1000 for n in range(3)}
+    assert [p.name for p in tmp_path.iterdir()] == ["index.json"]
+
+
+def test_atomic_write_keeps_the_old_file_on_error(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path, "w") as f:
+            f.write("new")
+            raise RuntimeError
+
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["index.json"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_streamed_chunks_match_json_load(tmp_path, chunk_size):
+    report_dir = write_results(tmp_path, varied_metrics(), {}).parent
+    with open(results_path(report_dir)) as f:
+        expected = create_metrics_df(json.load(f))
+
+    chunks = list(iter_metrics_chunks(report_dir, chunk_size=chunk_size))
+
+    assert [len(c) for c in chunks[:-1]] == [chunk_size] * (len(chunks) - 1)
+    assert_same_metrics(pd.concat(align_categoricals(chunks), ignore_index=True), expected)
+
+
+@pytest.mark.parametrize("with_text", [True, False])
+def test_parse_metrics_streams_above_threshold(tmp_path, monkeypatch, with_text):
+    report_dir = write_results(tmp_path, varied_metrics(), {}).parent
+    expected = parse_metrics(report_dir, with_text=with_text)
+    monkeypatch.setattr(benchmark_data, "STREAMING_THRESHOLD_BYTES", 100)
+
+    def load_whole_file(report_dir):
+        raise AssertionError("results file loaded with json.load")
+
+    monkeypatch.setattr(benchmark_data, "load_benchmark_data", load_whole_file)
+    progress = []
+
+    streamed = parse_metrics(report_dir, with_text=with_text, on_progress=progress.append)
+
+    assert sum(len(chunk) for chunk in progress) == len(streamed) == 25
+    assert_same_metrics(streamed, expected)
+    assert isinstance(streamed["language"].dtype, pd.CategoricalDtype)
+
+
+def test_parse_metrics_stream_file(tmp_path, monkeypatch):
+    metrics = varied_metrics()
+    json_dir = write_results(tmp_path / "json", metrics, {}).parent
+    writer = MetricsStreamWriter(tmp_path / "stream")
+    for record in metrics:
+        writer.append(record)
+    writer.close(summary={})
+    monkeypatch.setattr(benchmark_data, "STREAMING_THRESHOLD_BYTES", 100)
+
+    assert_same_metrics(parse_metrics(tmp_path / "stream"), parse_metrics(json_dir))
+
+
+def test_text_store_round_trips_rows_by_position(tmp_path):
+    report_dir = write_results(tmp_path, varied_metrics(), {}).parent
+    df = parse_metrics(report_dir)
+    write_sidecar(report_dir, df)
+    positions = [24, 0, 7, 7]
+
+    texts = read_texts(report_dir, positions)
+
+    expected = df.loc[positions, TEXT_COLUMNS]
+    assert texts.index.tolist() == positions
+    assert texts.astype("object").where(texts.notna(), None).to_dict("records") == \
+        expected.astype("object").where(expected.notna(), None).to_dict("records")
+    assert read_text_fields(report_dir, [3])["answer"].tolist() == [df["answer"][3]]
+    with pytest.raises(IndexError):
+        read_texts(report_dir, [25])
+
+
+def test_changed_source_invalidates_sidecar(tmp_path):
+    metrics = varied_metrics()
+    report_dir = write_results(tmp_path, metrics, {}).parent
+    convert_report(report_dir)
+    assert sidecar_is_current(report_dir)
+
+    metrics[3]["answer"] = "Rewritten answer"
+    results_file = write_results(report_dir, metrics, {})
+    # Within one mtime tick of the conversion; date the converted files back so the rewrite is newer
+    converted_ns = results_file.stat().st_mtime_ns - 10**9
+    for path in [sidecar_path(report_dir), text_store_path(report_dir)]:
+        os.utime(path, ns=(converted_ns, converted_ns))
+
+    assert not sidecar_is_current(report_dir)
+    # Until the report is converted again its texts come from the results file
+    assert read_text_fields(report_dir, [3])["answer"].tolist() == ["Rewritten answer"]
+    assert read_metrics(report_dir)["answer"][3] == "Rewritten answer"
+    assert sidecar_is_current(report_dir)
+
+
+def test_sidecar_of_older_layout_is_rebuilt(tmp_path, monkeypatch):
+    report_dir = write_results(tmp_path, varied_metrics(), {}).parent
+    convert_report(report_dir)
+    monkeypatch.setattr(benchmark_data, "SIDECAR_VERSION", str(int(SIDECAR_VERSION) + 1))
+
+    assert not sidecar_is_current(report_dir)
+    assert ensure_sidecar(report_dir)
+    assert sidecar_is_current(report_dir)
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from benchmark_data import create_metrics_df, read_metrics
+from benchmark_runner import (
+    TIMEOUT_ERROR,
+    StubServer,
+    http_target,
+    result_record,
+    run_benchmark,
+    write_results,
+)
+from case_index import case_ids
+from helpers import CASE
+
+CASES = [CASE, {**CASE, "question": "Which classes posted the most?", "need_retry": True}]
+
+
+def test_hung_request_is_recorded_as_timeout():
+    async def hang(case):
+        await asyncio.Event().wait()
+
+    metrics = asyncio.run(run_benchmark(CASES, hang, timeout=0.05))
+
+    assert [m["error_type"] for m in metrics] == [TIMEOUT_ERROR, TIMEOUT_ERROR]
+    assert all(m["duration"] >= 0.05 for m in metrics)
+
+
+def test_open_loop_durations_include_queueing_since_arrival():
+    service_seconds = 0.1
+
+    async def send(case):
+        await asyncio.sleep(service_seconds)
+        return {"answer": "42"}
+
+    # Requests arrive every 50 ms but are served one at a time, so each waits longer than the last
+    open_loop = asyncio.run(run_benchmark([CASE], send, iterations=4, concurrency=1, rate=20, arrivals="uniform"))
+    closed_loop = asyncio.run(run_benchmark([CASE], send, iterations=4, concurrency=1))
+
+    waits = [m["duration"] - service_seconds for m in open_loop]
+    assert waits == sorted(waits)
+    assert open_loop[-1]["duration"] == pytest.approx(4 * service_seconds - 3 * 0.05, abs=0.04)
+    assert max(m["duration"] for m in closed_loop) == pytest.approx(service_seconds, abs=0.04)
+
+
+def test_records_load_as_metrics(tmp_path):
+    async def run():
+        server = await StubServer(scale=0.001, error_rate=0.5, seed=1).start()
+        try:
+            return await run_benchmark(CASES, http_target(server.url), iterations=3)
+        finally:
+            await server.close()
+
+    metrics = asyncio.run(run())
+    report_dir = write_results(tmp_path / "report_20250101_000000", metrics, {"total": len(metrics)}).parent
+    df = create_metrics_df({"metrics": metrics})
+
+    assert len(df) == 6
+    assert set(df.columns) >= set(result_record(CASE, {}, None, None, None)) - {"operation_times"}
+    assert "operation_times.Basic Chat Processing" in df.columns
+    assert df["error_type"].notna().any() and df["error_type"].isna().any()
+    assert (df["test_case_id"].astype("object") == case_ids(df)).all()
+    assert read_metrics(report_dir)["duration"].tolist() == df["duration"].tolist()
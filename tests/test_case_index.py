@@ -0,0 +1,32 @@
+import benchmark_runner
+from benchmark_data import create_metrics_df
+from case_index import case_history, case_ids, cases_by_id, load_case_index, paired_deltas, update_case_index
+from helpers import CASE, record, write_report
+
+
+def test_runner_ids_match_ids_of_recorded_results():
+    follow_up = {**CASE, "chat_history": [{"role": "user", "content": "hi"}], "ai_search": True}
+    records = [record(0, case=case) for case in (CASE, follow_up, CASE)]
+
+    ids = case_ids(create_metrics_df({"metrics": records})).tolist()
+
+    assert ids == [benchmark_runner.test_case_id(CASE), benchmark_runner.test_case_id(follow_up), benchmark_runner.test_case_id(CASE)]
+    assert ids[0] != ids[1]
+    assert ids[0].startswith("en_simple_aggregations_basic_")
+
+
+def test_index_pairs_cases_across_runs(tmp_path):
+    baseline = write_report(tmp_path, "report_20250101_000000")
+    candidate = write_report(tmp_path, "report_20250102_000000")
+
+    index = update_case_index(tmp_path)
+    assert load_case_index(tmp_path) == index
+    cid = benchmark_runner.test_case_id(CASE)
+
+    history = case_history(cases_by_id(index), cid)
+    assert history["run_id"].tolist() == [baseline.name, candidate.name]
+    assert history["count"].tolist() == [3, 3]
+
+    deltas = paired_deltas(index, baseline.name, candidate.name)
+    assert deltas["case_id"].tolist() == [cid]
+    assert deltas["delta"].tolist() == [0.0]
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from benchmark_data import create_metrics_df, get_report_dirs, read_metrics
+from critical_path import OTHER_STAGE, dominant_tail_stage, stage_times, tail_breakdown, unmapped_operations
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "results"
+
+
+def metrics(operation_times, duration=10.0, count=20):
+    return create_metrics_df({"metrics": [
+        {"question": f"q{i}", "duration": duration, "error_type": None, "operation_times": operation_times}
+        for i in range(count)
+    ]})
+
+
+def test_query_generation_operations_belong_to_sql_generation():
+    df = metrics({"Initial Query Generation": 3.0, "Query Optimization": 4.0, "Answer Generation": 1.0})
+
+    stages = stage_times(df)
+
+    assert OTHER_STAGE not in stages.columns
+    assert stages["SQL Generation"].tolist() == [7.0] * len(df)
+    assert dominant_tail_stage(tail_breakdown(df)) == "SQL Generation"
+    assert unmapped_operations(df).empty
+
+
+def test_unmapped_operations_are_flagged():
+    df = metrics({"Brand New Step": 6.0, "Answer Generation": 1.0})
+
+    unmapped = unmapped_operations(df)
+
+    assert list(unmapped.index) == ["Brand New Step"]
+    assert abs(unmapped["Brand New Step"] - 0.6) < 1e-6
+    assert OTHER_STAGE in stage_times(df).columns
+
+
+def test_recorded_operations_are_all_mapped():
+    for report_dir in get_report_dirs(RESULTS_DIR):
+        assert unmapped_operations(read_metrics(report_dir, with_text=False)).empty, report_dir.name
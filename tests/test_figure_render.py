@@ -0,0 +1,38 @@
+import plotly.graph_objects as go
+
+import figure_render
+from figure_render import render_png_files, trim_image_cache
+
+
+def fake_render(fig_json, width, height, scale):
+    return b"\x89PNG" + fig_json.encode()[:64]
+
+
+def test_exported_files_survive_a_concurrent_trim(tmp_path, monkeypatch):
+    monkeypatch.setattr(figure_render, "render_png", fake_render)
+    cache_dir = tmp_path / "cache"
+    figs = [go.Figure(go.Bar(y=[i, i + 1])) for i in range(3)]
+
+    files = render_png_files(figs, tmp_path, max_workers=1, cache_dir=cache_dir)
+    # Another export trimming the cache to nothing while this one lays out its images
+    trim_image_cache(max_bytes=0, cache_dir=cache_dir)
+
+    assert not list(cache_dir.glob("*/*.png"))
+    assert [f.read_bytes() for f in files] == [fake_render(fig.to_json(), 0, 0, 0) for fig in figs]
+
+
+def test_images_are_rendered_once_and_evicted_ones_again(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(figure_render, "render_png", lambda *args: calls.append(args) or fake_render(*args))
+    cache_dir = tmp_path / "cache"
+    fig = go.Figure(go.Bar(y=[1, 2]))
+
+    render_png_files([fig, fig], tmp_path / "first", max_workers=1, cache_dir=cache_dir)
+    assert len(calls) == 1
+    render_png_files([fig], tmp_path / "second", max_workers=1, cache_dir=cache_dir)
+    assert len(calls) == 1
+
+    trim_image_cache(max_bytes=0, cache_dir=cache_dir)
+    files = render_png_files([fig], tmp_path / "third", max_workers=1, cache_dir=cache_dir)
+    assert len(calls) == 2
+    assert files[0].exists()
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from benchmark_data import create_metrics_df
+from filter_index import MISSING_VALUE, FilterIndex
+from helpers import CASE, record
+
+CASES = [
+    CASE,
+    {**CASE, "language": "vi", "complexity": "advanced", "features": "aggregation, join"},
+    {**CASE, "category": "trends", "features": "join,time_series"},
+    {**CASE, "language": "vi", "features": "time_series"},
+]
+ERRORS = [None, None, "TIMEOUT", None, "SQL_ERROR"]
+
+
+@pytest.fixture
+def df():
+    metrics = [record(i, ERRORS[i % len(ERRORS)], CASES[i % len(CASES)]) for i in range(40)]
+    return create_metrics_df({"metrics": metrics})
+
+
+def mask(df, facet, values):
+    """The boolean mask a selection of ``values`` of ``facet`` stands for."""
+    if facet == "features":
+        tokens = df[facet].astype("object").map(lambda v: {t.strip() for t in v.split(",")})
+        return tokens.map(lambda t: bool(t & set(values))).to_numpy()
+    column = df[facet].astype("object")
+    matched = column.isin([v for v in values if v != MISSING_VALUE])
+    if MISSING_VALUE in values:
+        matched |= column.isna()
+    return matched.to_numpy()
+
+
+@pytest.mark.parametrize("facet, values", [
+    ("language", ["vi"]),
+    ("language", ["en", "vi"]),
+    ("complexity", ["advanced"]),
+    ("error_type", [MISSING_VALUE]),
+    ("error_type", ["TIMEOUT", MISSING_VALUE]),
+    ("features", ["join"]),
+    ("features", ["aggregation", "time_series"]),
+    ("category", ["unknown"]),
+])
+def test_select_matches_boolean_mask(df, facet, values):
+    index = FilterIndex.from_frame(df)
+
+    np.testing.assert_array_equal(index.select({facet: values}), mask(df, facet, values))
+
+
+def test_select_combines_facets(df):
+    index = FilterIndex.from_frame(df)
+    selections = {"language": ["vi"], "error_type": [MISSING_VALUE], "features": ["join"], "complexity": []}
+
+    expected = np.logical_and.reduce([mask(df, f, v) for f, v in selections.items() if v])
+    np.testing.assert_array_equal(index.select(selections), expected)
+    assert index.select({}).all()
+
+
+def test_counts_match_masks(df):
+    index = FilterIndex.from_frame(df)
+
+    for facet in index.facets:
+        for value in index.values(facet):
+            assert index.counts(facet)[value] == mask(df, facet, [value]).sum()
+    assert index.values("features") == ["aggregation", "join", "time_series"]
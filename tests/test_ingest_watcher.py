@@ -0,0 +1,94 @@
+import threading
+
+from benchmark_data import results_path
+from case_index import load_case_index
+from helpers import record, write_report
+from ingest_watcher import IngestWatcher
+from results_stream import MetricsStreamWriter
+from run_index import load_run_index, update_run_index
+
+
+def test_concurrent_ingestion_keeps_every_run(tmp_path):
+    report_dirs = [write_report(tmp_path, f"report_20250101_00000{i}") for i in range(6)]
+    watcher = IngestWatcher(tmp_path, settle_seconds=0)
+    errors = []
+
+    def ingest(dirs):
+        try:
+            for report_dir in dirs:
+                watcher.ingest(report_dir)
+                update_run_index(tmp_path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest, args=(report_dirs[i::3],)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    names = {d.name for d in report_dirs}
+    assert set(load_run_index(tmp_path)["runs"]) == names
+    assert set(load_case_index(tmp_path)["runs"]) == names
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def indexed_runs(results_dir):
+    return set(load_run_index(results_dir)["runs"])
+
+
+def test_report_waits_for_settle_delay(tmp_path):
+    report_dir = write_report(tmp_path, "report_20250101_000000")
+    written = results_path(report_dir).stat().st_mtime
+    now = written + 1
+    watcher = IngestWatcher(tmp_path, settle_seconds=5, clock=lambda: now)
+
+    assert watcher.poll() == []
+    assert watcher.pending == {report_dir.name}
+    assert indexed_runs(tmp_path) == set()
+
+    now = written + 6
+    assert watcher.poll() == [report_dir]
+    assert watcher.pending == set()
+    assert indexed_runs(tmp_path) == {report_dir.name}
+
+
+def test_truncated_json_is_not_ingested(tmp_path):
+    report_dir = write_report(tmp_path, "report_20250101_000000")
+    results_file = results_path(report_dir)
+    complete = results_file.read_bytes()
+    results_file.write_bytes(complete[:len(complete) // 2])
+    watcher = IngestWatcher(tmp_path, settle_seconds=0)
+
+    assert watcher.poll() == []
+    assert report_dir.name in watcher.errors
+    assert indexed_runs(tmp_path) == set()
+    # Not retried until the file changes
+    assert watcher.poll() == []
+
+    results_file.write_bytes(complete)
+    assert watcher.poll() == [report_dir]
+    assert watcher.errors == {}
+    assert indexed_runs(tmp_path) == {report_dir.name}
+
+
+def test_stream_is_ingested_once_complete(tmp_path):
+    report_dir = tmp_path / "report_20250101_000000"
+    writer = MetricsStreamWriter(report_dir)
+    watcher = IngestWatcher(tmp_path, settle_seconds=0)
+
+    for i in range(3):
+        writer.append(record(i))
+        writer.sync()
+        assert watcher.poll() == []
+        assert watcher.pending == set()
+    # A record cut off in the middle of its line
+    with open(results_path(report_dir), "ab") as f:
+        f.write(b'{"question": "How many')
+    assert watcher.poll() == []
+    assert indexed_runs(tmp_path) == set()
+
+    writer.close(summary={"total": 3})
+    assert watcher.poll() == [report_dir]
+    assert load_run_index(tmp_path)["runs"][report_dir.name]["overall"]["count"] == 3
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pytest
+
+from latency_sketch import LatencySketch
+
+
+def durations(seed, size=5000):
+    return np.random.default_rng(seed).lognormal(mean=0.5, sigma=1.0, size=size)
+
+
+@pytest.mark.parametrize("q", [0.01, 0.25, 0.5, 0.9, 0.95, 0.99])
+def test_quantile_within_relative_accuracy(q):
+    values = durations(0)
+    sketch = LatencySketch()
+    sketch.add_many(values)
+
+    # The sketch estimates the value of rank q * (n - 1), rounded down
+    expected = np.percentile(values, q * 100, method="lower")
+    assert abs(sketch.quantile(q) - expected) <= sketch.relative_accuracy * expected
+
+
+def test_merge_equals_sketch_of_union():
+    first, second = durations(1), np.append(durations(2, 300), [0.0, np.nan])
+    merged = LatencySketch()
+    merged.add_many(first)
+    other = LatencySketch()
+    other.add_many(second)
+    merged.merge(other)
+
+    union = LatencySketch()
+    union.add_many(np.concatenate([first, second]))
+
+    assert merged.bins == union.bins
+    assert (merged.count, merged.zero_count, merged.min, merged.max) == (
+        union.count, union.zero_count, union.min, union.max)
+    assert merged.total == pytest.approx(union.total)
+    assert merged.quantiles([0.5, 0.99]) == union.quantiles([0.5, 0.99])
+
+
+def test_dict_round_trip():
+    sketch = LatencySketch(relative_accuracy=0.02)
+    sketch.add_many(np.append(durations(3, 200), 0.0))
+
+    restored = LatencySketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+    assert restored.to_dict() == sketch.to_dict()
+    assert restored.quantiles([0.1, 0.5, 0.99]) == sketch.quantiles([0.1, 0.5, 0.99])
+
+
+def test_empty_sketch_round_trip():
+    restored = LatencySketch.from_dict(LatencySketch().to_dict())
+
+    assert restored.count == 0
+    assert np.isnan(restored.quantile(0.5))
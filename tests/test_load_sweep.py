@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+from load_sweep import find_knee
+
+# Latency stays flat up to 4 requests/s, then the target saturates: throughput
+# levels off while latency climbs steeply
+SATURATING_THROUGHPUTS = [1.0, 2.0, 3.0, 4.0, 4.5, 4.6]
+SATURATING_LATENCIES = [0.5, 0.5, 0.55, 0.6, 2.0, 8.0]
+
+
+def test_knee_is_last_step_before_saturation():
+    assert find_knee(SATURATING_THROUGHPUTS, SATURATING_LATENCIES) == 3
+
+
+def test_knee_of_queueing_curve():
+    # M/M/1 response time 1 / (mu - lambda) with a service rate of 10 requests/s
+    rates = [1, 2, 3, 4, 5, 6, 7, 8, 9, 9.5, 9.9]
+    knee = find_knee(rates, [1 / (10 - rate) for rate in rates])
+
+    assert knee is not None and rates[knee] == 9
+
+
+@pytest.mark.parametrize("throughputs, latencies", [
+    ([], []),
+    ([1.0], [0.5]),
+    ([1.0, 2.0], [0.5, 4.0]),
+])
+def test_too_few_steps_have_no_knee(throughputs, latencies):
+    assert find_knee(throughputs, latencies) is None
+
+
+@pytest.mark.parametrize("throughputs, latencies", [
+    ([1.0, 2.0, 3.0, 4.0], [0.5, 0.5, 0.5, 0.5]),
+    ([2.0, 2.0, 2.0, 2.0], [0.5, 1.0, 2.0, 4.0]),
+    ([1.0, 2.0, 3.0, 4.0], [1.0, 2.0, 3.0, 4.0]),
+    ([1.0, 2.0, math.nan, 4.0], [0.5, 0.6, 0.7, 5.0]),
+])
+def test_curve_without_knee(throughputs, latencies):
+    assert find_knee(throughputs, latencies) is None
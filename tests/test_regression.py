@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+
+from benchmark_data import create_metrics_df
+from regression import compare_runs, mann_whitney, wilcoxon_signed_rank
+
+
+def test_wilcoxon_signed_rank():
+    # n = 10 positive differences: W = 55, mean 27.5, variance 96.25
+    w, p = wilcoxon_signed_rank(np.arange(1, 11))
+    assert w == 55
+    assert math.isclose(p, math.erfc((27.5 - 0.5) / math.sqrt(96.25) / math.sqrt(2)))
+
+    assert wilcoxon_signed_rank([1, -1, 2, -2, 3, -3]) == (10.5, 1.0)
+    assert wilcoxon_signed_rank([0, 0, 0]) == (0.0, 1.0)
+
+
+def run(durations):
+    return create_metrics_df({"metrics": [
+        {"question": f"question {case}", "language": "en", "category": "c", "complexity": "basic",
+         "duration": duration, "error_type": None, "iteration": iteration, "operation_times": {}}
+        for case, case_durations in enumerate(durations)
+        for iteration, duration in enumerate(case_durations)
+    ]})
+
+
+def test_paired_cases_use_the_signed_rank_test():
+    # Cases of very different lengths, each 10% slower in the candidate
+    base = np.geomspace(1, 60, 12)
+    baseline = run([[d, d] for d in base])
+    candidate = run([[d * 1.1, d * 1.1] for d in base])
+
+    overall = compare_runs(baseline, candidate, dimension=None).set_index("metric").loc["duration"]
+
+    assert overall["pairs"] == 12
+    assert math.isclose(overall["p_value"], wilcoxon_signed_rank(base * 0.1)[1])
+    assert overall["p_value"] < 0.01
+    # The unpaired test cannot see the shift through the spread between cases
+    assert mann_whitney(np.repeat(base, 2), np.repeat(base * 1.1, 2))[1] > 0.5
+    assert overall["verdict"] == "regression"
+    assert math.isclose(overall["median_change"], 0.1)
+    assert overall["mean_change_low"] > 0
+
+
+def test_median_and_mean_change_are_reported_separately():
+    # Only the slowest case doubles: the median does not move, the mean does
+    base = [1.0] * 11 + [100.0]
+    baseline = run([[d, d] for d in base])
+    candidate = run([[d, d] for d in base[:-1]] + [[200.0, 200.0]])
+
+    overall = compare_runs(baseline, candidate, dimension=None).set_index("metric").loc["duration"]
+
+    assert overall["median_change"] == 0
+    assert overall["mean_change_high"] > 0.5
+    assert overall["verdict"] == "no change"
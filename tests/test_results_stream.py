@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_data import TEXT_COLUMNS, parse_metrics
+from helpers import CASE, record
+from results_stream import MetricsStreamWriter, RunTail
+
+
+def test_tail_frame_when_errors_start_in_a_later_batch(tmp_path):
+    writer = MetricsStreamWriter(tmp_path)
+    tail = RunTail(tmp_path)
+    for i in range(3):
+        writer.append(record(i))
+    writer.sync()
+    assert tail.poll() == 3
+    assert tail.frame()["error_type"].isna().all()
+
+    writer.append(record(3, "SQL_ERROR"))
+    writer.append(record(4))
+    writer.close(summary={"total": 5})
+    assert tail.poll() == 2
+
+    frame = tail.frame()
+    assert len(frame) == 5
+    assert frame["error_type"].tolist()[3] == "SQL_ERROR"
+    assert frame["error_type"].isna().sum() == 4
+    assert tail.stats()["errors"] == 1
+    assert tail.complete
+
+
+def write_batches(tmp_path, batches):
+    """Stream the records of each batch, polling a tail after each; returns the tail and all records."""
+    writer = MetricsStreamWriter(tmp_path)
+    tail = RunTail(tmp_path)
+    records = []
+    for batch in batches:
+        for metric in batch:
+            writer.append(metric)
+        writer.sync()
+        tail.poll()
+        records += batch
+    writer.close(summary={"total": len(records)})
+    return tail, records
+
+
+def test_tail_frame_matches_parsed_stream(tmp_path):
+    # New categories (past the int8 code range), a new operation and a missing iteration in later batches
+    batches = [
+        [record(i) for i in range(3)],
+        [record(i, "SQL_ERROR", {**CASE, "category": f"category_{i}"}) for i in range(200)],
+        [{**record(0), "operation_times": {"Query Fixing": 0.25}, "iteration": None}],
+    ]
+    tail, _ = write_batches(tmp_path, batches)
+
+    expected = parse_metrics(tmp_path, with_text=False)
+    frame = tail.frame()
+    assert list(frame.columns) == list(expected.columns)
+    for column in frame.columns:
+        assert frame[column].astype("object").where(frame[column].notna(), None).tolist() == \
+            expected[column].astype("object").where(expected[column].notna(), None).tolist(), column
+    assert isinstance(frame["category"].dtype, pd.CategoricalDtype)
+    assert frame["iteration"].isna().tolist() == [False] * 203 + [True]
+
+
+def test_tail_frame_shares_rows_read_before(tmp_path):
+    writer = MetricsStreamWriter(tmp_path)
+    tail = RunTail(tmp_path)
+    for i in range(10):
+        writer.append(record(i))
+    writer.sync()
+    tail.poll()
+    before = tail.frame()
+
+    writer.append(record(10, "SQL_ERROR"))
+    writer.sync()
+    tail.poll()
+    after = tail.frame()
+
+    assert len(after) == 11
+    assert np.shares_memory(before["duration"].to_numpy(), after["duration"].to_numpy())
+    assert np.shares_memory(before["error_type"].array.codes, after["error_type"].array.codes)
+    assert before["error_type"].isna().all()
+
+
+def test_tail_text_fields_read_single_lines(tmp_path):
+    batches = [[record(i) for i in range(3)], [{**record(i), "answer": f"Answer {i}"} for i in range(3, 5)]]
+    tail, records = write_batches(tmp_path, batches)
+
+    texts = tail.text_fields([4, 0])
+
+    assert texts.index.tolist() == [4, 0]
+    assert texts["answer"].tolist() == ["Answer 4", records[0]["answer"]]
+    assert list(texts.columns) == TEXT_COLUMNS
+    with pytest.raises(IndexError):
+        tail.text_fields([5])
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from benchmark_runner import write_results
+from helpers import record
+from latency_sketch import LatencySketch
+from run_index import DURATION_METRIC, PERCENTILES, percentile_frame, update_run_index
+
+
+def write_run(results_dir, name, durations):
+    metrics = [{**record(i), "duration": duration} for i, duration in enumerate(durations)]
+    write_results(results_dir / name, metrics, {"total": len(metrics)})
+
+
+def test_merged_percentiles_cover_every_run(tmp_path):
+    runs = {"report_20250101_000000": np.linspace(0.5, 2.0, 40), "report_20250102_000000": np.linspace(3.0, 9.0, 25)}
+    for name, durations in runs.items():
+        write_run(tmp_path, name, durations)
+    index = update_run_index(tmp_path)
+
+    merged = percentile_frame(index, list(runs), merge_runs=True)
+    duration = merged[merged["metric"] == DURATION_METRIC].iloc[0]
+
+    assert set(merged["run_id"]) == {"all"}
+    assert duration["count"] == 65
+    union = LatencySketch()
+    union.add_many(np.concatenate(list(runs.values())))
+    for p in PERCENTILES:
+        assert duration[f"p{p}"] == pytest.approx(union.quantile(p / 100))
+    per_run = percentile_frame(index, list(runs))
+    assert per_run.loc[per_run["metric"] == DURATION_METRIC, "count"].sum() == 65
+
+
+def test_unindexed_run_has_no_percentiles(tmp_path):
+    write_run(tmp_path, "report_20250101_000000", [1.0, 2.0, 3.0])
+    index = update_run_index(tmp_path)
+
+    assert percentile_frame(index, ["report_20250102_000000"]).empty
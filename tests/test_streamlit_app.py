@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_data import create_metrics_df, get_report_dirs, results_path
+from streamlit_app import calculate_query_times
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "results"
+
+
+def loop_query_times(metrics):
+    """The row-by-row calculation calculate_query_times replaced, over the raw records."""
+    query_times = []
+    for metric in metrics:
+        operation_times = metric.get("operation_times") or {}
+        if not operation_times:
+            continue
+        exec_times = sum(
+            float(operation_times.get(op, 0))
+            for op in ["Query Execution", "Query Execution 1", "Query Execution 2", "Query Fixing"]
+        )
+        if metric["ai_search_pattern"]:
+            total_time = exec_times + float(operation_times.get("VannaAI SQL Generation", 0))
+            mode = "AI Search"
+        else:
+            total_time = exec_times + sum(
+                float(operation_times.get(op, 0))
+                for op in ["Initial Query Generation", "Table Retrieval", "Column Extraction", "Query Optimization"]
+            )
+            mode = "Normal Flow"
+        query_times.append({"Mode": mode, "Complexity": metric["complexity"], "Total Query Time": total_time})
+    return pd.DataFrame(query_times)
+
+
+@pytest.mark.parametrize("report_dir", get_report_dirs(RESULTS_DIR), ids=lambda d: d.name)
+def test_calculate_query_times_matches_the_loop(report_dir):
+    with open(results_path(report_dir), encoding="utf-8") as f:
+        metrics = json.load(f)["metrics"]
+
+    expected = loop_query_times(metrics)
+    actual = calculate_query_times(create_metrics_df({"metrics": metrics}))
+
+    assert actual["Mode"].astype(str).tolist() == expected["Mode"].tolist()
+    assert actual["Complexity"].astype(str).tolist() == expected["Complexity"].tolist()
+    # Operation times are stored as float32
+    np.testing.assert_allclose(actual["Total Query Time"], expected["Total Query Time"], rtol=1e-6, atol=1e-5)
+
+
+def test_calculate_query_times_skips_cases_without_operations():
+    df = create_metrics_df({"metrics": [
+        {"question": "a", "complexity": "basic", "ai_search_pattern": "", "duration": 1.0, "operation_times": {}},
+        {"question": "b", "complexity": "basic", "ai_search_pattern": "pattern_detection", "duration": 1.0,
+         "operation_times": {"VannaAI SQL Generation": 2.0, "Query Execution": 0.5, "Table Retrieval": 9.0}},
+    ]})
+
+    result = calculate_query_times(df)
+
+    assert result["Mode"].astype(str).tolist() == ["AI Search"]
+    assert result["Total Query Time"].tolist() == [2.5]